@@ -6,6 +6,8 @@ import datetime
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
+import sheet_handles
+
 st.set_page_config(layout="wide")
 
 st.title("📊 Device Manufacturing and Assembly Dashboard")
@@ -13,25 +15,28 @@ st.title("📊 Device Manufacturing and Assembly Dashboard")
 
 # Google Sheets API Setup
 scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = ServiceAccountCredentials.from_json_keyfile_name("google_sheets_key.json", scope)
-client = gspread.authorize(creds)
-
-# Open Google Sheet by URL
 sheet_url = "https://docs.google.com/spreadsheets/d/1iWmEDXzfoqRPenAePMBOPSR-NCwelPCU-yZcQOyTltA/edit#gid=451421278"
-spreadsheet = client.open_by_url(sheet_url)
-worksheet = spreadsheet.worksheet("Sheet2")  # Ensure this matches the actual sheet name
-dashboard_worksheet = spreadsheet.worksheet("DashBoard")
+
+
+# Authorize, open the spreadsheet and load its worksheet metadata once per process
+@st.cache_resource(show_spinner=False)
+def get_sheet_handles():
+    creds = ServiceAccountCredentials.from_json_keyfile_name("google_sheets_key.json", scope)
+    client = gspread.authorize(creds)
+    return sheet_handles.SheetHandles(client.open_by_url(sheet_url))
+
+
+sheets = get_sheet_handles()
 # Read data from Google Sheets
-data = worksheet.get_all_records()
+data = sheets.get_all_records("Sheet2")  # Ensure this matches the actual sheet name
 df = pd.DataFrame(data)
 
 # Trim spaces from column names
 df.columns = df.columns.str.strip()
 
  # Fetch data from DashBoard sheet (X8:Y8) for PWA Inventory scorecard
-dashboard_worksheet = spreadsheet.worksheet("DashBoard")
-scorecard_data = dashboard_worksheet.get_values("X8:Y8")
-additional_scorecards = dashboard_worksheet.get_values("AA2:AB4")
+scorecard_data = sheets.get_values("DashBoard", "X8:Y8")
+additional_scorecards = sheets.get_values("DashBoard", "AA2:AB4")
 
 st.write("### Inventory Overview")
 
@@ -77,7 +82,7 @@ if additional_scorecards:
                 st.plotly_chart(fig_scorecard, use_container_width=True, config={"displayModeBar": False})
 
 # Fetch data from DashBoard sheet (W1:Z2) for progress bar
-progress_data = dashboard_worksheet.get_values("W1:Z2")
+progress_data = sheets.get_values("DashBoard", "W1:Z2")
 if progress_data:
     labels = progress_data[0]
     values = list(map(int, progress_data[1]))
@@ -255,8 +260,7 @@ with col2:
 #st.dataframe(df.head(entries_to_show))
 
 # Fetch data from Sheet1
-worksheet2 = spreadsheet.worksheet("Sheet1")  # Fetching data from Sheet1
-data2 = worksheet2.get_values("A:I")
+data2 = sheets.get_values("Sheet1", "A:I")  # Fetching data from Sheet1
 df2 = pd.DataFrame(data2[1:], columns=data2[0])  # First row as header
 
 # Trim spaces from column names
@@ -269,8 +273,7 @@ df2.columns = df2.columns.str.strip()
 
 
 # Fetch data from DashBoard sheet (W9:X14)
-dashboard_worksheet = spreadsheet.worksheet("DashBoard")
-dashboard_data = dashboard_worksheet.get_values("W9:X13")
+dashboard_data = sheets.get_values("DashBoard", "W9:X13")
 df_dashboard = pd.DataFrame(dashboard_data[1:], columns=dashboard_data[0])  # First row as header
 
 # Trim spaces from column names
@@ -352,7 +355,7 @@ with col1:
 
 
 # Fetch data from DashBoard sheet (X15:Z27) for stacked bar and stacked line chart
-stacked_data = dashboard_worksheet.get_values("X15:Z27")
+stacked_data = sheets.get_values("DashBoard", "X15:Z27")
 df_stacked = pd.DataFrame(stacked_data[1:], columns=stacked_data[0])  # First row as header
 
 # Convert columns to numeric, skipping rows with zero values
@@ -0,0 +1,109 @@
+"""Host-wide dataset snapshot shared by every Streamlit replica.
+
+One replica fetches the sheets and publishes them as uncompressed Arrow IPC
+(Feather v2) files plus a JSON manifest; every replica on the host then
+memory-maps those files instead of fetching its own copy. The files are
+versioned and the manifest is swapped in last with ``os.replace``, so a reader
+never sees a half-written snapshot, and an exclusive lock file makes sure only
+one replica refreshes a stale snapshot while the others wait for it.
+"""
+import contextlib
+import json
+import os
+import time
+
+import pyarrow.feather as feather
+
+from history_store import to_arrow
+
+try:
+    import fcntl
+except ImportError:  # Windows: replicas may fetch concurrently
+    fcntl = None
+
+MANIFEST = "manifest.json"
+LOCK_FILE = ".publish.lock"
+KEEP_VERSIONS = 2
+
+
+def read_manifest(root):
+    """The current manifest, or None when nothing has been published"""
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_fresh(manifest, max_age):
+    return manifest is not None and time.time() - manifest["published_at"] < max_age
+
+
+def publish(root, frames, meta, version):
+    """Write frames as Arrow files for version, then point the manifest at them"""
+    os.makedirs(root, exist_ok=True)
+    files = {}
+    for name, df in frames.items():
+        file_name = f"{name}-{version}.arrow"
+        tmp_path = os.path.join(root, file_name + ".tmp")
+        feather.write_feather(to_arrow(df), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, os.path.join(root, file_name))
+        files[name] = file_name
+
+    manifest = {"version": version, "published_at": time.time(), "files": files, "meta": meta}
+    tmp_manifest = os.path.join(root, MANIFEST + ".tmp")
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f, default=str)
+    os.replace(tmp_manifest, os.path.join(root, MANIFEST))
+    _remove_old_versions(root, manifest)
+    return manifest
+
+
+def _remove_old_versions(root, manifest):
+    # Readers that mapped an older file keep their mapping after it is unlinked
+    arrow_files = sorted((e for e in os.scandir(root) if e.name.endswith(".arrow")),
+                         key=lambda e: e.stat().st_mtime, reverse=True)
+    versions = []
+    for entry in arrow_files:
+        version = entry.name.rsplit("-", 1)[-1][:-len(".arrow")]
+        if version not in versions:
+            versions.append(version)
+        if version != manifest["version"] and versions.index(version) >= KEEP_VERSIONS:
+            os.remove(entry.path)
+
+
+def open_tables(root, manifest):
+    """Memory-map every table of a manifest (zero-copy: pages are shared between processes)"""
+    return {
+        name: feather.read_table(os.path.join(root, file_name), memory_map=True)
+        for name, file_name in manifest["files"].items()
+    }
+
+
+@contextlib.contextmanager
+def _publish_lock(root):
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def shared_snapshot(root, fetch, max_age):
+    """Mapped tables and manifest for the host's snapshot, refreshing it when stale
+
+    fetch() returns (frames, meta, version) and is called by at most one
+    replica at a time; the others block on the lock and then map its result.
+    """
+    manifest = read_manifest(root)
+    if not is_fresh(manifest, max_age):
+        with _publish_lock(root):
+            manifest = read_manifest(root)
+            if not is_fresh(manifest, max_age):
+                frames, meta, version = fetch()
+                manifest = publish(root, frames, meta, version)
+    return open_tables(root, manifest), manifest
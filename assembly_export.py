@@ -0,0 +1,52 @@
+"""CSV and Parquet export of the filtered assembly rows.
+
+Exports are built from ``data_store.iter_assembly_rows`` one chunk at a time,
+so the filtered rows never exist as one frame. The finished file itself is
+held in memory: Streamlit needs it as bytes to serve the download. The
+download buttons pass a callable, so the file is built only when the button
+is clicked, not on every rerun.
+"""
+import io
+
+import pyarrow.parquet as pq
+
+from history_store import to_arrow
+
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def write_csv(chunks, sink):
+    """Write frames to sink as one CSV file (header from the first chunk)"""
+    header = True
+    for chunk in chunks:
+        sink.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+
+
+def write_parquet(chunks, sink):
+    """Write frames to sink as one Parquet file, one row group per chunk"""
+    writer = None
+    try:
+        for chunk in chunks:
+            table = to_arrow(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            elif table.schema != writer.schema:
+                table = table.cast(writer.schema)  # Cold (Parquet) and hot rows can differ in dtype
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_file(chunks, fmt):
+    """Bytes of the chunks written as one CSV or Parquet file"""
+    sink = io.BytesIO()
+    if fmt == "Parquet":
+        write_parquet(chunks, sink)
+    else:
+        write_csv(chunks, sink)
+    return sink.getvalue()
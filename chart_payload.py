@@ -0,0 +1,134 @@
+"""Compact Plotly payloads for the dashboard charts.
+
+In compact mode every chart goes through ``compact_figure`` before it is sent:
+marker/text scatter traces that differ only in their data (such as one-point
+label bubbles drawn over bars) are merged into a single trace, and scatter
+traces switch to WebGL once a figure carries more than
+``WEBGL_POINT_THRESHOLD`` points. Each chart's serialized size can be
+reported against a per-page budget. Plotly's default JSON engine already
+uses orjson when it is installed, so only the requirement is needed for
+faster serialization.
+"""
+import collections
+import json
+import threading
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+WEBGL_POINT_THRESHOLD = 1000
+PAGE_PAYLOAD_BUDGET_BYTES = 1_000_000
+# Trace properties that hold data; everything else counts as styling
+DATA_KEYS = ("x", "y", "text", "customdata", "hovertext")
+_COMPACTED_MAX_ENTRIES = 64
+
+_compacted = collections.OrderedDict()
+_compacted_lock = threading.Lock()
+
+
+def _point_count(trace):
+    return len(trace.get("x") if trace.get("x") is not None else trace.get("y") or ())
+
+
+def _style_key(trace):
+    style = {k: v for k, v in trace.items() if k not in DATA_KEYS}
+    present = [k for k in DATA_KEYS if trace.get(k) is not None]
+    return json.dumps([style, present], sort_keys=True, default=str)
+
+
+def _is_array(value):
+    return value is not None and not isinstance(value, (str, bytes, dict)) and hasattr(value, "__len__")
+
+
+def _mergeable(trace):
+    # Lines would be joined end to end, and filled traces stack on the previous trace, so only
+    # marker/text traces whose data are arrays are merged
+    modes = set(str(trace.get("mode", "")).split("+"))
+    return (trace.get("type", "scatter") == "scatter" and not trace.get("fill")
+            and trace.get("mode") is not None and "lines" not in modes
+            and _is_array(trace.get("x"))
+            and all(_is_array(trace[k]) for k in DATA_KEYS if trace.get(k) is not None))
+
+
+def merge_styled_traces(traces):
+    """Merge scatter traces that share every non-data property into one trace each"""
+    merged = []
+    groups = {}
+    for trace in traces:
+        if not _mergeable(trace):
+            merged.append(trace)
+            continue
+        key = _style_key(trace)
+        if key not in groups:
+            groups[key] = {**trace, **{k: list(trace[k]) for k in DATA_KEYS if trace.get(k) is not None}}
+            merged.append(groups[key])
+            continue
+        target = groups[key]
+        for k in DATA_KEYS:
+            if trace.get(k) is not None:
+                target[k].extend(trace[k])
+    return merged
+
+
+def compact_figure(fig, webgl_threshold=WEBGL_POINT_THRESHOLD):
+    """Smaller equivalent of fig: merged label traces, WebGL scatter above the point threshold"""
+    spec = fig.to_plotly_json()
+    traces = merge_styled_traces(spec["data"])
+    if sum(_point_count(t) for t in traces) > webgl_threshold:
+        traces = [{**t, "type": "scattergl"} if t.get("type", "scatter") == "scatter" else t for t in traces]
+    return go.Figure(data=traces, layout=spec["layout"], skip_invalid=True)
+
+
+def _compact_cached(fig):
+    # Keyed by object identity; holding the source figure keeps its id from being reused
+    with _compacted_lock:
+        entry = _compacted.get(id(fig))
+        if entry is not None and entry[0] is fig:
+            _compacted.move_to_end(id(fig))
+            return entry[1]
+    compacted = compact_figure(fig)
+    with _compacted_lock:
+        _compacted[id(fig)] = (fig, compacted)
+        while len(_compacted) > _COMPACTED_MAX_ENTRIES:
+            _compacted.popitem(last=False)
+    return compacted
+
+
+def figure_bytes(fig):
+    """Size of the figure as sent to the browser"""
+    return len(pio.to_json(fig, validate=False).encode())
+
+
+def payload_controls():
+    """Sidebar switches for compact rendering and the payload report"""
+    compact = st.sidebar.toggle("Compact charts", value=True, key="compact_charts",
+                                help="Merge label traces, use WebGL for large charts")
+    report = st.sidebar.toggle("Show chart payload sizes", key="payload_report")
+    st.session_state.chart_payloads = {}
+    return compact, report
+
+
+def plotly_chart(name, fig, **kwargs):
+    """st.plotly_chart with compact mode applied and the payload size recorded under name"""
+    if st.session_state.get("compact_charts", True):
+        fig = _compact_cached(fig)
+    if st.session_state.get("payload_report"):
+        st.session_state.setdefault("chart_payloads", {})[name] = figure_bytes(fig)
+    return st.plotly_chart(fig, **kwargs)
+
+
+def payload_report(budget=PAGE_PAYLOAD_BUDGET_BYTES):
+    """Sidebar table of figure bytes per chart with the page total against the budget"""
+    payloads = st.session_state.get("chart_payloads") or {}
+    if not payloads:
+        return
+    total = sum(payloads.values())
+    with st.sidebar.expander("Chart payloads", expanded=total > budget):
+        for name, size in payloads.items():
+            st.write(f"`{name}`: {size / 1024:.1f} KB")
+        message = f"Page total: {total / 1024:.1f} KB of {budget / 1024:.0f} KB budget"
+        if total > budget:
+            st.error(message)
+        else:
+            st.caption(message)
@@ -0,0 +1,372 @@
+"""Cached access to the assembly data in Google Sheets.
+
+Recent assemblies (the hot window) stay in memory inside the cached snapshot;
+everything older is written to month-partitioned Parquet files by
+``history_store`` and only read back when a date range reaches that far.
+The raw sheets themselves are shared by all replicas on a host through the
+memory-mapped snapshot in ``arrow_snapshot``.
+"""
+import dataclasses
+import datetime
+import hashlib
+import os
+import pickle
+import time
+
+import gspread
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from google.oauth2.service_account import Credentials
+
+import arrow_snapshot
+import entry_queue
+import history_store
+from rolling_analytics import DailySeries, daily_counts
+from rollups import RollupPyramid
+from traceability import PwaIndex
+from filter_index import CATEGORY_COLUMNS, PWA_COLUMN, AssemblyIndex, pwa_numbers
+
+# ✅ Define the correct OAuth Scopes
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.file",
+    "https://www.googleapis.com/auth/drive"
+]
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/1iWmEDXzfoqRPenAePMBOPSR-NCwelPCU-yZcQOyTltA/edit#gid=451421278"
+DATE_COLUMN = history_store.DATE_COLUMN
+
+# How long a synced snapshot is reused before Sheet2 is read again
+SYNC_TTL_SECONDS = 300
+# Rows newer than this stay in memory; covers This Week/Month/Quarter and the default Custom range
+HOT_WINDOW_DAYS = 120
+# Every DashBoard range the app reads, fetched together once per sync
+DASHBOARD_RANGES = ("X8:Y8", "AA2:AB4", "W1:Z1", "W1:Z2", "W3:Z3", "W4:Z4",
+                    "W9:AF13", "X15:Z27")
+# Per-batch device counts: device types in column W, then one count column per batch (header row 9).
+# The range is read wide; the API trims empty trailing cells, so its width is the number of batches.
+DISTRIBUTION_RANGE = "W9:AF13"
+# Count columns headed only "Count" (or nothing) are numbered by position from this batch
+DISTRIBUTION_FIRST_BATCH = 3
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+HISTORY_DIR = os.path.join(DATA_DIR, "assembly_history")
+# Replicas on one host map the same snapshot from here; DASHBOARD_SHARE_SNAPSHOT=0 fetches per process
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR", os.path.join(DATA_DIR, "snapshot"))
+SHARE_SNAPSHOT = os.environ.get("DASHBOARD_SHARE_SNAPSHOT", "1") != "0"
+# Assembly entries made in the app wait here until they are appended to Sheet2
+ENTRY_QUEUE_PATH = os.environ.get("DASHBOARD_ENTRY_QUEUE", os.path.join(DATA_DIR, "entry_queue.sqlite"))
+ENTRY_FLUSH_SECONDS = 30
+# Traceability source shown for entries not yet in the cached Sheet2 read
+ENTRY_SOURCE = "App entry"
+
+
+@dataclasses.dataclass
+class AssemblySnapshot:
+    """Hot tier of the assembly table plus what the UI needs about the full history"""
+    hot: pd.DataFrame
+    hot_start: datetime.date
+    device_types: list
+    index: AssemblyIndex
+    batches: list = dataclasses.field(default_factory=list)
+    pwa_bounds: tuple = None
+    sheet1: pd.DataFrame = None
+    trace: PwaIndex = None
+    version: str = ""
+    daily: pd.DataFrame = None
+    rollups: RollupPyramid = None
+    synced_at: float = 0.0
+    dashboard: dict = None
+
+
+def data_version(*parts):
+    """Short content hash identifying one version of some sheet data"""
+    return hashlib.blake2b(pickle.dumps(parts), digest_size=8).hexdigest()
+
+
+def hot_window_start(today=None):
+    """First day of the month that opens the in-memory window"""
+    today = today or datetime.date.today()
+    return (today - datetime.timedelta(days=HOT_WINDOW_DAYS)).replace(day=1)
+
+
+@st.cache_resource(show_spinner=False)
+def get_spreadsheet():
+    """Authenticate once per process and keep the spreadsheet handle"""
+    credentials_dict = st.secrets["GOOGLE_SHEETS_CREDENTIALS"]
+    creds = Credentials.from_service_account_info(credentials_dict, scopes=SCOPES)
+    client = gspread.authorize(creds)
+    return client.open_by_url(SHEET_URL)
+
+
+@st.cache_resource(show_spinner=False)
+def _daily_series():
+    # Outlives each snapshot so a sync that only appended rows extends the series
+    return DailySeries()
+
+
+def _trace_index(sheet2, sheet1):
+    # Only the traceability columns of Sheet2 are kept, so cold rows cost a few bytes each
+    return PwaIndex({"Sheet2": sheet2[_trace_columns(sheet2)], "Sheet1": sheet1})
+
+
+def _trace_columns(sheet2):
+    return [c for c in (PWA_COLUMN, "Device Type", DATE_COLUMN, "Batch") if c in sheet2.columns]
+
+
+def _fetch_sheets():
+    # The one upstream read per sync: Sheet2, Sheet1 and every DashBoard range
+    fetched_at = time.time()
+    spreadsheet = get_spreadsheet()
+    data = spreadsheet.worksheet("Sheet2").get_all_records()
+    df = pd.DataFrame(data)
+    df.columns = df.columns.str.strip()
+    if DATE_COLUMN in df.columns:
+        # Dates may carry a time of day (e.g. "2024-05-02 14:35"), mixed with plain dates
+        df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN], errors="coerce", format="mixed")
+
+    # Sheet1 is read with the same snapshot so traceability spans both sheets
+    data2 = spreadsheet.worksheet("Sheet1").get_values("A:I")
+    sheet1 = pd.DataFrame(data2[1:], columns=data2[0]) if data2 else pd.DataFrame()
+    sheet1 = _labelled_columns(sheet1)
+
+    dashboard_worksheet = spreadsheet.worksheet("DashBoard")
+    dashboard = {range_name: dashboard_worksheet.get_values(range_name) for range_name in DASHBOARD_RANGES}
+    meta = {"dashboard": dashboard, "fetched_at": fetched_at}
+    return {"sheet2": df, "sheet1": sheet1}, meta, data_version(data, data2)
+
+
+def _labelled_columns(frame):
+    # A raw range can have blank or repeated header cells; Arrow needs one column per name
+    frame = frame.set_axis(frame.columns.astype(str).str.strip(), axis=1)
+    frame = frame.loc[:, frame.columns != ""]
+    seen = {}
+    names = []
+    for name in frame.columns:
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return frame.set_axis(names, axis=1)
+
+
+def _arrow_strings(arrow_type):
+    # to_arrow writes large_string under pandas 3
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def _to_pandas(table):
+    # Text columns stay on the Arrow buffers instead of becoming per-process Python strings
+    return table.to_pandas(types_mapper=_arrow_strings)
+
+
+def load_sheets():
+    """Sheet2 frame, Sheet1 frame, sync metadata and data version of the current sync
+
+    The metadata holds the DashBoard values ("dashboard") and the time the
+    sheet reads began ("fetched_at").
+
+    With SHARE_SNAPSHOT on, one replica per host fetches the sheets and
+    publishes them as Arrow files; every replica memory-maps those files, so
+    the OS page cache holds one copy of the raw tables for the whole host.
+    Nothing is cached here: load_assembly_snapshot keeps what it needs and
+    the full frames are dropped once its hot tier is cut.
+    """
+    if not SHARE_SNAPSHOT:
+        frames, meta, version = _fetch_sheets()
+        return frames["sheet2"], frames["sheet1"], meta, version
+    tables, manifest = arrow_snapshot.shared_snapshot(SNAPSHOT_DIR, _fetch_sheets, SYNC_TTL_SECONDS)
+    return _to_pandas(tables["sheet2"]), _to_pandas(tables["sheet1"]), manifest["meta"], manifest["version"]
+
+
+@st.cache_resource(ttl=SYNC_TTL_SECONDS, show_spinner=False)
+def load_assembly_snapshot():
+    """Spill Sheet2 rows older than the hot window to Parquet and keep the rest
+
+    The snapshot is shared by every session without copying, so callers must
+    treat its frames as read-only.
+    """
+    df, sheet1, meta, version = load_sheets()
+
+    device_types = list(df["Device Type"].unique()) if "Device Type" in df.columns else []
+    batches = sorted(df["Batch"].astype(str).unique()) if "Batch" in df.columns else []
+    pwa_bounds = None
+    if PWA_COLUMN in df.columns:
+        numbers = pd.Series(pwa_numbers(df[PWA_COLUMN])).dropna()
+        pwa_bounds = (int(numbers.min()), int(numbers.max())) if not numbers.empty else None
+
+    hot_start = hot_window_start()
+    if DATE_COLUMN not in df.columns:
+        return AssemblySnapshot(hot=df, hot_start=datetime.date.min, device_types=device_types,
+                                index=AssemblyIndex(df), batches=batches, pwa_bounds=pwa_bounds,
+                                sheet1=sheet1, trace=_trace_index(df, sheet1), version=version,
+                                rollups=RollupPyramid(df), synced_at=meta["fetched_at"],
+                                dashboard=meta["dashboard"])
+
+    daily = _daily_series().update(df)
+    is_cold = df[DATE_COLUMN] < pd.Timestamp(hot_start)
+    history_store.sync_partitions(df[is_cold], HISTORY_DIR)
+
+    hot = df[~is_cold].reset_index(drop=True)
+    return AssemblySnapshot(hot=hot, hot_start=hot_start, device_types=device_types,
+                            index=AssemblyIndex(hot), batches=batches, pwa_bounds=pwa_bounds,
+                            sheet1=sheet1, trace=_trace_index(df, sheet1), version=version, daily=daily,
+                            rollups=RollupPyramid(df), synced_at=meta["fetched_at"],
+                            dashboard=meta["dashboard"])
+
+
+def load_dashboard_values():
+    """Values of every DashBoard range, keyed by A1 range (shared read-only)"""
+    return load_assembly_snapshot().dashboard
+
+
+
+def distribution_batches(header, width):
+    """Batch names of the width count columns after the device type column"""
+    names = []
+    for position in range(width):
+        name = str(header[position + 1]).strip() if position + 1 < len(header) else ""
+        generic = not name or name.lower() == "count"
+        names.append(f"Batch {DISTRIBUTION_FIRST_BATCH + position}" if generic else name)
+    return names
+
+
+def distribution_counts(dashboard_values):
+    """Long-form (Batch, Device Type, Count) table from the DashBoard distribution block"""
+    rows = dashboard_values.get(DISTRIBUTION_RANGE) or []
+    width = max((len(row) - 1 for row in rows), default=0)
+    batches = distribution_batches(rows[0], width) if rows else []
+    records = []
+    for row in rows[1:]:
+        if not row or not row[0]:
+            continue
+        for batch, count in zip(batches, row[1:]):
+            records.append({"Batch": batch, "Device Type": row[0],
+                            "Count": pd.to_numeric(count, errors="coerce")})
+    table = pd.DataFrame(records, columns=["Batch", "Device Type", "Count"])
+    return table.fillna({"Count": 0}).astype({"Count": int})
+
+
+def queue_entries(records):
+    """Queue new assembly records for Sheet2; they show in current_snapshot() at once"""
+    return entry_queue.enqueue(ENTRY_QUEUE_PATH, records)
+
+
+def _append_to_sheet2(records):
+    worksheet = get_spreadsheet().worksheet("Sheet2")
+    header = [column.strip() for column in worksheet.row_values(1)]
+    worksheet.append_rows([[record.get(column, "") for column in header] for record in records],
+                          value_input_option="USER_ENTERED")
+
+
+@st.cache_resource(show_spinner=False)
+def start_entry_flusher():
+    """Start this process's background flush of queued entries to Sheet2 (once)"""
+    return entry_queue.start_flusher(ENTRY_QUEUE_PATH, _append_to_sheet2, ENTRY_FLUSH_SECONDS)
+
+
+@st.cache_resource(ttl=SYNC_TTL_SECONDS, max_entries=8, show_spinner=False)
+def _with_entries(version, _snapshot, _records):
+    # Extends the hot tier, indexes, rollups, daily series and PWA search with the local rows only
+    local = pd.DataFrame(list(_records)).reindex(columns=_snapshot.hot.columns)
+    local[DATE_COLUMN] = pd.to_datetime(local[DATE_COLUMN], errors="coerce", format="mixed")
+    hot = pd.concat([_snapshot.hot, local], ignore_index=True)
+    daily = _snapshot.daily
+    if daily is not None:
+        daily = daily.add(daily_counts(local), fill_value=0).astype(int)
+    device_types, batches = _snapshot.device_types, _snapshot.batches
+    if "Device Type" in local.columns:
+        device_types = list(dict.fromkeys([*device_types, *local["Device Type"].dropna()]))
+    if "Batch" in local.columns:
+        batches = sorted(set(batches) | set(local["Batch"].dropna().astype(str)))
+    pwa_bounds, trace = _snapshot.pwa_bounds, _snapshot.trace
+    if PWA_COLUMN in local.columns:
+        numbers = pd.Series(pwa_numbers(local[PWA_COLUMN])).dropna()
+        if not numbers.empty:
+            low, high = int(numbers.min()), int(numbers.max())
+            pwa_bounds = (min(low, pwa_bounds[0]), max(high, pwa_bounds[1])) if pwa_bounds else (low, high)
+        if trace is not None:
+            trace = trace.extended(ENTRY_SOURCE, local[_trace_columns(local)])
+    return dataclasses.replace(_snapshot, hot=hot, index=AssemblyIndex(hot), version=version, daily=daily,
+                               device_types=device_types, batches=batches, pwa_bounds=pwa_bounds, trace=trace,
+                               rollups=_snapshot.rollups.extended(local))
+
+
+def current_snapshot():
+    """The cached snapshot plus app-entered rows that its sheet read could not include yet"""
+    snapshot = load_assembly_snapshot()
+    entries = entry_queue.unsynced(ENTRY_QUEUE_PATH, snapshot.synced_at)
+    if not entries or DATE_COLUMN not in snapshot.hot.columns:
+        return snapshot
+    ids, records = zip(*entries)
+    return _with_entries(data_version(snapshot.version, ids), snapshot, records)
+
+
+@st.cache_resource(ttl=SYNC_TTL_SECONDS, show_spinner=False)
+def load_history_range(start_date, end_date, columns=None):
+    """Cold-tier rows for start_date..end_date, restricted to the given columns"""
+    return history_store.read_range(HISTORY_DIR, start_date, end_date, list(columns) if columns else None)
+
+
+@st.cache_resource(ttl=SYNC_TTL_SECONDS, show_spinner=False)
+def load_history_index(start_date, end_date, columns):
+    """Cold-tier rows for start_date..end_date together with their bitmap index"""
+    cold = load_history_range(start_date, end_date, columns)
+    return cold, AssemblyIndex(cold)
+
+
+def select_assembly_rows(snapshot, start_date, end_date, filters=None, pwa_range=None, columns=None):
+    """Rows matching the filters, answered from the precomputed bitmap indexes
+
+    The hot tier uses the index built with the snapshot; a range that reaches
+    past the hot window also indexes the Parquet rows it loads, once per range.
+    """
+    positions = snapshot.index.select(filters, (start_date, end_date), pwa_range)
+    hot = snapshot.hot.iloc[positions]
+    if columns is not None:
+        hot = hot[list(columns)]
+    if start_date >= snapshot.hot_start:
+        return hot
+
+    read_columns = None
+    if columns is not None:
+        indexed = [c for c in (DATE_COLUMN, PWA_COLUMN, *CATEGORY_COLUMNS) if c in snapshot.hot.columns]
+        read_columns = tuple(dict.fromkeys([*indexed, *columns]))
+    cold_end = min(end_date, snapshot.hot_start - datetime.timedelta(days=1))
+    cold, cold_index = load_history_index(start_date, cold_end, read_columns)
+    if cold.empty:
+        return hot
+    cold = cold.iloc[cold_index.select(filters, pwa_range=pwa_range)]
+    if columns is not None:
+        cold = cold[list(columns)]
+    return pd.concat([cold, hot], ignore_index=True)
+
+
+def iter_assembly_rows(snapshot, start_date, end_date, filters=None, pwa_range=None, chunk_rows=50_000):
+    """Rows matching the filters as a sequence of frames of at most chunk_rows rows
+
+    Meant for exports: older history is read one month partition at a time
+    (bypassing the range cache) and hot rows are sliced out of the snapshot
+    per chunk, so a multi-year range never exists as one frame. At least one
+    (possibly empty) frame is yielded so writers always see the columns.
+    """
+    yielded = False
+    if start_date < snapshot.hot_start:
+        cold_end = min(end_date, snapshot.hot_start - datetime.timedelta(days=1))
+        for month in history_store.months_between(start_date, cold_end):
+            month_start = max(start_date, datetime.date.fromisoformat(f"{month}-01"))
+            month_end = min(cold_end, (pd.Timestamp(month_start) + pd.offsets.MonthEnd(0)).date())
+            part = history_store.read_range(HISTORY_DIR, month_start, month_end)
+            if part.empty:
+                continue
+            part = part.iloc[AssemblyIndex(part).select(filters, pwa_range=pwa_range)]
+            for offset in range(0, len(part), chunk_rows):
+                yielded = True
+                yield part.iloc[offset:offset + chunk_rows]
+
+    positions = snapshot.index.select(filters, (start_date, end_date), pwa_range)
+    for offset in range(0, len(positions), chunk_rows):
+        yielded = True
+        yield snapshot.hot.iloc[positions[offset:offset + chunk_rows]]
+    if not yielded:
+        yield snapshot.hot.iloc[:0]
@@ -0,0 +1,166 @@
+"""Durable local queue of assembly entries waiting to be written to Sheet2.
+
+Entries typed into the app are stored in a SQLite file first, so the
+operator's submit never waits on Google Sheets and survives a restart. A
+background flusher sends them in bulk ``append_rows`` calls. A batch is
+claimed inside a transaction, so replicas sharing the file never send the
+same entry twice while it is in flight. A failed batch is retried with
+exponential backoff. Delivery is at least once: a process that dies between
+the append and the acknowledgement sends the batch again once its claim
+expires.
+
+Sent entries are kept for a while with their send time. The dashboard
+overlays every entry the cached snapshot cannot contain yet (pending, or
+sent after the snapshot's sheet read began).
+"""
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+BATCH_SIZE = 500
+CLAIM_SECONDS = 120  # A claim older than this is considered abandoned
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+KEEP_SENT_SECONDS = 3600
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    claimed_at REAL,
+    sent_at REAL,
+    last_error TEXT
+)
+"""
+
+
+@contextlib.contextmanager
+def _connect(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(_SCHEMA)
+        yield connection
+    finally:
+        connection.close()
+
+
+@contextlib.contextmanager
+def _transaction(connection):
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def enqueue(path, records):
+    """Store records (dicts keyed by Sheet2 column) for the next flush; returns their ids"""
+    now = time.time()
+    with _connect(path) as connection, _transaction(connection):
+        return [
+            connection.execute("INSERT INTO entries (record, created_at) VALUES (?, ?)",
+                               (json.dumps(record, default=str), now)).lastrowid
+            for record in records
+        ]
+
+
+def unsynced(path, since):
+    """(id, record) of entries not yet sent, or sent at or after since"""
+    if not os.path.exists(path):
+        return []
+    with _connect(path) as connection:
+        rows = connection.execute(
+            "SELECT id, record FROM entries WHERE sent_at IS NULL OR sent_at >= ? ORDER BY id", (since,))
+        return [(entry_id, json.loads(record)) for entry_id, record in rows]
+
+
+def status(path):
+    """Pending entry count, the oldest pending entry's age in seconds, and the last error"""
+    if not os.path.exists(path):
+        return {"pending": 0, "oldest_seconds": None, "last_error": None}
+    with _connect(path) as connection:
+        pending, oldest = connection.execute(
+            "SELECT COUNT(*), MIN(created_at) FROM entries WHERE sent_at IS NULL").fetchone()
+        error = connection.execute(
+            "SELECT last_error FROM entries WHERE sent_at IS NULL AND last_error IS NOT NULL "
+            "ORDER BY id DESC LIMIT 1").fetchone()
+    return {
+        "pending": pending,
+        "oldest_seconds": time.time() - oldest if oldest else None,
+        "last_error": error[0] if error else None,
+    }
+
+
+def _claim(connection, now, batch_size):
+    with _transaction(connection):
+        rows = connection.execute(
+            "SELECT id, record, attempts FROM entries WHERE sent_at IS NULL AND next_attempt_at <= ? "
+            "AND (claimed_at IS NULL OR claimed_at < ?) ORDER BY id LIMIT ?",
+            (now, now - CLAIM_SECONDS, batch_size)).fetchall()
+        connection.executemany("UPDATE entries SET claimed_at = ? WHERE id = ?", [(now, row[0]) for row in rows])
+    return rows
+
+
+def flush(path, append, batch_size=BATCH_SIZE):
+    """Send due entries through append(records) in batches; returns the number sent
+
+    append receives a list of record dicts and must raise when the write
+    fails. Failed batches are released for a later retry with backoff.
+    """
+    if not os.path.exists(path):
+        return 0
+    sent = 0
+    with _connect(path) as connection:
+        while True:
+            now = time.time()
+            rows = _claim(connection, now, batch_size)
+            if not rows:
+                break
+            ids = [(row[0],) for row in rows]
+            try:
+                append([json.loads(row[1]) for row in rows])
+            except Exception as e:
+                LOGGER.warning("Flushing %d assembly entries failed: %s", len(rows), e)
+                with _transaction(connection):
+                    connection.executemany(
+                        "UPDATE entries SET claimed_at = NULL, attempts = attempts + 1, last_error = ?, "
+                        "next_attempt_at = ? WHERE id = ?",
+                        [(str(e), now + min(RETRY_BASE_SECONDS * 2 ** attempts, RETRY_MAX_SECONDS), entry_id)
+                         for entry_id, _, attempts in rows])
+                break
+            with _transaction(connection):
+                connection.executemany("UPDATE entries SET sent_at = ?, claimed_at = NULL, last_error = NULL "
+                                       "WHERE id = ?", [(time.time(),) + i for i in ids])
+            sent += len(rows)
+        with _transaction(connection):
+            connection.execute("DELETE FROM entries WHERE sent_at < ?", (time.time() - KEEP_SENT_SECONDS,))
+    return sent
+
+
+def start_flusher(path, append, interval):
+    """Daemon thread flushing the queue every interval seconds"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                if status(path)["pending"]:
+                    flush(path, append)
+            except Exception:
+                LOGGER.exception("Assembly entry flusher failed")
+
+    thread = threading.Thread(target=run, name="entry-flusher", daemon=True)
+    thread.start()
+    return thread
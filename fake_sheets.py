@@ -0,0 +1,179 @@
+"""Local stand-in for the Google Sheets workbook behind the dashboards.
+
+Serves a synthetic copy of Sheet1, Sheet2 and the DashBoard ranges through the
+same gspread calls the apps make, sleeps for a configurable latency on every
+call and records each call so tools can count upstream requests.
+"""
+import contextlib
+import datetime
+import random
+import threading
+import time
+from unittest import mock
+
+import gspread
+
+DEVICE_TYPES = ["Alpha", "Beta", "Gamma", "Delta"]
+BATCHES = ["Batch 2", "Batch 3", "Batch 4"]
+
+
+def synthetic_workbook(rows=5000, days=730, seed=0, today=None, timestamped=False):
+    """Sheet contents shaped like the production workbook, keyed by sheet title
+
+    With timestamped, assembly dates carry a time of day ("2024-05-02 14:35").
+    """
+    rnd = random.Random(seed)
+    today = today or datetime.date.today()
+    sheet2 = []
+    for i in range(rows):
+        day = today - datetime.timedelta(days=rnd.randrange(days))
+        assembled = day.isoformat()
+        if timestamped:
+            assembled += f" {rnd.randrange(24):02d}:{rnd.randrange(60):02d}"
+        sheet2.append({
+            "Date of Assambly": assembled,
+            "Device Type": rnd.choice(DEVICE_TYPES),
+            "PWA No": f"PWA{100000 + i}",
+            "Batch": rnd.choice(BATCHES),
+            "Status": "Failed" if rnd.random() < 0.04 else "Used",
+        })
+    sheet1 = [["PWA No", "Device Type", "Tested By", "Status"]] + [
+        [row["PWA No"], row["Device Type"], f"Operator {i % 7}", "OK" if i % 50 else "Rework"]
+        for i, row in enumerate(sheet2)
+    ]
+
+    header = ["Used", "Failed", "Spare", "Total PWA"]
+    dashboard = {
+        "X8:Y8": [["PWA Inventory", str(rows)]],
+        "AA2:AB4": [["Batch 2 Stock", "120"], ["Batch 3 Stock", "340"], ["Batch 4 Stock", "560"]],
+        "W1:Z1": [header],
+        "W1:Z2": [header, ["400", "20", "30", "1000"]],
+        "W3:Z3": [["700", "35", "15", "800"]],
+        "W4:Z4": [["150", "10", "40", "1200"]],
+        "W9:X13": [["Device Type", "Count"]] + [[d, str(10 + 5 * i)] for i, d in enumerate(DEVICE_TYPES)],
+        "W9:AF13": [["Device Type", "Count", "Batch 4"]] + [
+            [d, str(10 + 5 * i), str(20 + 3 * i)] for i, d in enumerate(DEVICE_TYPES)
+        ],
+        "X15:Z27": [["Month", "Batch 3", "Batch 4"]] + [
+            [datetime.date(2000, m, 1).strftime("%b"), str(rnd.randint(0, 90)), str(rnd.randint(0, 90))]
+            for m in range(1, 13)
+        ],
+    }
+    return {"Sheet1": sheet1, "Sheet2": sheet2, "DashBoard": dashboard}
+
+
+class CallLog:
+    """Thread-safe record of every upstream call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def add(self, method, *args):
+        with self._lock:
+            self.calls.append((method, *args))
+
+    def __len__(self):
+        with self._lock:
+            return len(self.calls)
+
+    def count(self, method=None):
+        with self._lock:
+            return sum(1 for call in self.calls if method is None or call[0] == method)
+
+    def clear(self):
+        with self._lock:
+            self.calls.clear()
+
+
+class FakeWorksheet:
+    def __init__(self, client, title):
+        self.client = client
+        self.title = title
+
+    def _content(self):
+        if self.title not in self.client.workbook:
+            # What the API answers for a range on a renamed or deleted sheet
+            response = mock.Mock(status_code=400, text="")
+            response.json.return_value = {"error": {
+                "code": 400, "message": f"Unable to parse range: {self.title}", "status": "INVALID_ARGUMENT"}}
+            raise gspread.exceptions.APIError(response)
+        return self.client.workbook[self.title]
+
+    def get_all_records(self):
+        self.client._call("get_all_records", self.title)
+        self._content()
+        return [dict(row) for row in self.client.workbook[self.title]]
+
+    def _rows(self):
+        content = self.client.workbook[self.title]
+        if content and isinstance(content[0], dict):
+            header = list(content[0])
+            return [header] + [[str(row[c]) for c in header] for row in content]
+        return [list(row) for row in content]
+
+    def get_values(self, range_name=None):
+        self.client._call("get_values", self.title, range_name)
+        content = self._content()
+        if isinstance(content, dict):
+            return [list(row) for row in content.get(range_name, [])]
+        return self._rows()
+
+    def row_values(self, row):
+        self.client._call("row_values", self.title, row)
+        return self._rows()[row - 1]
+
+    def append_rows(self, values, value_input_option="RAW"):
+        self.client._call("append_rows", self.title, len(values))
+        if self.client.fail_writes:
+            self.client.fail_writes -= 1
+            raise ConnectionError("injected write failure")
+        content = self.client.workbook[self.title]
+        if content and isinstance(content[0], dict):
+            header = list(content[0])
+            content.extend(dict(zip(header, row)) for row in values)
+        else:
+            content.extend(list(row) for row in values)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client):
+        self.client = client
+
+    def worksheet(self, title):
+        self.client._call("worksheet", title)
+        if title not in self.client.workbook:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return FakeWorksheet(self.client, title)
+
+    def worksheets(self):
+        self.client._call("worksheets")
+        return [FakeWorksheet(self.client, title) for title in self.client.workbook]
+
+
+class FakeClient:
+    """gspread client serving a synthetic workbook with injected latency"""
+
+    def __init__(self, workbook=None, latency=0.0, fail_writes=0):
+        self.workbook = workbook if workbook is not None else synthetic_workbook()
+        self.latency = latency
+        self.fail_writes = fail_writes  # Number of upcoming append_rows calls to fail
+        self.log = CallLog()
+
+    def _call(self, method, *args):
+        self.log.add(method, *args)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def open_by_url(self, url):
+        self._call("open_by_url", url)
+        return FakeSpreadsheet(self)
+
+
+@contextlib.contextmanager
+def patched(client):
+    """Route gspread authorization in both apps to client"""
+    with mock.patch("gspread.authorize", return_value=client), \
+            mock.patch("google.oauth2.service_account.Credentials.from_service_account_info"), \
+            mock.patch("oauth2client.service_account.ServiceAccountCredentials.from_json_keyfile_name"):
+        yield client
@@ -0,0 +1,101 @@
+"""Precomputed bitmap indexes over the assembly table.
+
+Categorical columns (device type, batch) get one packed bitmap per distinct
+value; dates and PWA numbers keep their row positions in sorted order so a
+range becomes two binary searches. Any filter combination is then answered by
+AND-ing a handful of bitmaps instead of re-comparing whole columns.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = "Date of Assambly"
+PWA_COLUMN = "PWA No"
+CATEGORY_COLUMNS = ("Device Type", "Batch")
+
+
+def pwa_numbers(values):
+    """Numeric part of each PWA number (e.g. 'PWA-01234' -> 1234), NaN when there is none"""
+    digits = pd.Series(values, dtype=str).str.extract(r"(\d+)", expand=False)
+    return pd.to_numeric(digits, errors="coerce").to_numpy(dtype=float)
+
+
+class AssemblyIndex:
+    """Bitmap and sorted-position indexes over one assembly frame"""
+
+    def __init__(self, df):
+        self.row_count = len(df)
+        self.bitmaps = {}
+        for column in CATEGORY_COLUMNS:
+            if column not in df.columns:
+                continue
+            # Keyed by text so sheet rows and Parquet rows agree on e.g. batch 3 vs "3"
+            codes, uniques = pd.factorize(df[column].astype(str), sort=False)
+            self.bitmaps[column] = {
+                value: np.packbits(codes == code) for code, value in enumerate(uniques)
+            }
+
+        self._sorted = {}
+        if DATE_COLUMN in df.columns:
+            self._add_sorted(DATE_COLUMN, df[DATE_COLUMN].to_numpy(dtype="datetime64[ns]"))
+        if PWA_COLUMN in df.columns:
+            self._add_sorted(PWA_COLUMN, pwa_numbers(df[PWA_COLUMN]))
+
+    def _add_sorted(self, column, values):
+        valid = np.flatnonzero(~pd.isna(values))
+        order = valid[np.argsort(values[valid], kind="stable")]
+        self._sorted[column] = (values[order], order)
+
+    def values(self, column):
+        """Distinct values indexed for a categorical column"""
+        return list(self.bitmaps.get(column, {}))
+
+    def bounds(self, column):
+        """(min, max) of a range-indexed column, or None when it has no values"""
+        if column not in self._sorted or not len(self._sorted[column][0]):
+            return None
+        sorted_values = self._sorted[column][0]
+        return sorted_values[0], sorted_values[-1]
+
+    def _all(self):
+        return np.packbits(np.ones(self.row_count, dtype=bool))
+
+    def any_of(self, column, values):
+        """Bitmap of rows whose column equals any of values"""
+        result = np.zeros((self.row_count + 7) // 8, dtype=np.uint8)
+        for value in values:
+            bitmap = self.bitmaps.get(column, {}).get(str(value))
+            if bitmap is not None:
+                result |= bitmap
+        return result
+
+    def between(self, column, low, high):
+        """Bitmap of rows whose column lies in low..high inclusive"""
+        sorted_values, order = self._sorted[column]
+        start = np.searchsorted(sorted_values, low, side="left")
+        stop = np.searchsorted(sorted_values, high, side="right")
+        mask = np.zeros(self.row_count, dtype=bool)
+        mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def select(self, filters=None, date_range=None, pwa_range=None):
+        """Row positions matching every given filter
+
+        filters maps a categorical column to the values to keep; a column that
+        is absent (or maps to None) is not filtered. date_range and pwa_range
+        are inclusive (low, high) pairs.
+        """
+        result = self._all()
+        for column, values in (filters or {}).items():
+            if values is not None and column in self.bitmaps:
+                result &= self.any_of(column, values)
+        if date_range is not None and DATE_COLUMN in self._sorted:
+            low, high = (pd.Timestamp(v) for v in date_range)
+            if not isinstance(date_range[1], datetime.datetime):
+                high += pd.Timedelta(days=1) - pd.Timedelta(1, "ns")  # A plain end date covers its whole day
+            low, high = np.datetime64(low, "ns"), np.datetime64(high, "ns")
+            result &= self.between(DATE_COLUMN, low, high)
+        if pwa_range is not None and PWA_COLUMN in self._sorted:
+            result &= self.between(PWA_COLUMN, *pwa_range)
+        return np.flatnonzero(np.unpackbits(result, count=self.row_count))
@@ -0,0 +1,86 @@
+"""Inventory depletion forecast per PWA batch.
+
+Remaining stock per batch (Total PWA - Used - Failed, from the W1:Z4 block of
+the DashBoard sheet) is projected forward at the batch's recent consumption
+rate, fitted from the cached daily assembly series. The band comes from the
+standard error of the mean daily consumption over the fit window.
+"""
+import datetime
+import math
+import re
+
+import pandas as pd
+
+FIT_DAYS = 60
+Z_SCORE = 1.96  # 95% band
+# Rows of the DashBoard inventory block per batch; W1:Z1 holds the labels
+BATCH_ROWS = {"Batch 2": "W3:Z3", "Batch 3": "W1:Z2", "Batch 4": "W4:Z4"}
+
+
+def batch_key(value):
+    """Batch number as text ('Batch 3', 'B3' and 3 all give '3'), or the value itself"""
+    match = re.search(r"\d+", str(value))
+    return match.group(0) if match else str(value).strip()
+
+
+def remaining_inventory(dashboard_values):
+    """{batch: Total PWA - Used - Failed} from the DashBoard inventory block"""
+    labels = dashboard_values["W1:Z1"][0] if dashboard_values.get("W1:Z1") else []
+    remaining = {}
+    for batch, range_name in BATCH_ROWS.items():
+        rows = dashboard_values.get(range_name) or []
+        if not labels or not rows:
+            continue
+        values = list(map(int, rows[-1]))
+        remaining[batch] = (values[labels.index("Total PWA")] - values[labels.index("Used")]
+                            - values[labels.index("Failed")])
+    return remaining
+
+
+def consumption_rates(daily, fit_days=FIT_DAYS, today=None):
+    """Mean boards consumed per day per batch over the last fit_days, with a confidence band"""
+    if daily is None or daily.empty or "Batch" not in daily.index.names:
+        return pd.DataFrame(columns=["rate", "rate_low", "rate_high"])
+    today = pd.Timestamp(today or datetime.date.today())
+    per_day = daily.groupby(["Batch", "day"])["boards"].sum().unstack("Batch", fill_value=0)
+    per_day = per_day.T.groupby(per_day.columns.map(batch_key)).sum().T
+    calendar = pd.date_range(today - pd.Timedelta(days=fit_days - 1), today, freq="D")
+    per_day = per_day.reindex(calendar, fill_value=0)
+
+    rate = per_day.mean()
+    error = Z_SCORE * per_day.std(ddof=1) / math.sqrt(len(per_day))
+    return pd.DataFrame({
+        "rate": rate,
+        "rate_low": (rate - error).clip(lower=0),
+        "rate_high": rate + error,
+    })
+
+
+def forecast_depletion(remaining, rates, today=None):
+    """Projected run-out date per batch with the earliest/latest dates of the band
+
+    A batch that is not being consumed (or whose lower rate bound is zero)
+    gets no run-out date (or no latest date).
+    """
+    today = pd.Timestamp(today or datetime.date.today())
+
+    def run_out(stock, rate):
+        if stock <= 0:
+            return today
+        if not rate or rate <= 0 or pd.isna(rate):
+            return pd.NaT
+        return today + pd.Timedelta(days=math.ceil(stock / rate))
+
+    rows = []
+    for batch, stock in remaining.items():
+        fitted = rates.loc[batch_key(batch)] if batch_key(batch) in rates.index else None
+        rate = fitted["rate"] if fitted is not None else 0.0
+        rows.append({
+            "Batch": batch,
+            "Remaining PWA": stock,
+            "PWA per day": round(float(rate), 1),
+            "Run-out date": run_out(stock, rate),
+            "Earliest": run_out(stock, fitted["rate_high"] if fitted is not None else 0.0),
+            "Latest": run_out(stock, fitted["rate_low"] if fitted is not None else 0.0),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,104 @@
+"""Month-partitioned Parquet storage for older assembly history.
+
+Each calendar month lives in its own hive-style directory
+(``<root>/month=YYYY-MM/part-0.parquet``) so a date range only opens the
+partitions it overlaps, and only the requested columns are decoded.
+"""
+import datetime
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DATE_COLUMN = "Date of Assambly"
+PARTITION_COLUMN = "month"
+PART_FILE = "part-0.parquet"
+HASH_KEY = b"content_hash"
+
+
+def month_key(date):
+    """Return the partition key (YYYY-MM) for a date or timestamp"""
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+def months_between(start_date, end_date):
+    """List the partition keys covering start_date..end_date inclusive"""
+    months = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _partition_path(root, month):
+    return os.path.join(root, f"{PARTITION_COLUMN}={month}")
+
+
+def to_arrow(df):
+    """Arrow table for a sheet frame; mixed-type text columns are stored as strings"""
+    df = df.reset_index(drop=True).copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype(str)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _stored_hash(file_path):
+    if not os.path.exists(file_path):
+        return None
+    metadata = pq.read_schema(file_path).metadata or {}
+    return metadata.get(HASH_KEY)
+
+
+def sync_partitions(df, root):
+    """Write each month of df to its partition, rewriting only months whose rows changed.
+
+    Partitions for months that no longer appear in df are removed. Returns the
+    list of month keys that were (re)written.
+    """
+    os.makedirs(root, exist_ok=True)
+    df = df.dropna(subset=[DATE_COLUMN])
+    months = df[DATE_COLUMN].dt.strftime("%Y-%m")
+
+    written = []
+    for month, part in df.groupby(months, sort=True):
+        content_hash = str(pd.util.hash_pandas_object(part.astype(str), index=False).sum()).encode()
+        path = _partition_path(root, month)
+        file_path = os.path.join(path, PART_FILE)
+        if _stored_hash(file_path) == content_hash:
+            continue
+
+        table = to_arrow(part)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), HASH_KEY: content_hash})
+        os.makedirs(path, exist_ok=True)
+        # Replicas sharing the directory may rewrite the same month; each writes its own file
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, file_path)
+        written.append(month)
+
+    live = set(months.unique())
+    for entry in os.listdir(root):
+        if entry.startswith(f"{PARTITION_COLUMN}=") and entry.split("=", 1)[1] not in live:
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    return written
+
+
+def read_range(root, start_date, end_date, columns=None):
+    """Load rows dated start_date..end_date, opening only the overlapping partitions"""
+    months = [m for m in months_between(start_date, end_date)
+              if os.path.exists(os.path.join(_partition_path(root, m), PART_FILE))]
+    if not months:
+        return pd.DataFrame(columns=columns or [DATE_COLUMN])
+
+    paths = [os.path.join(_partition_path(root, m), PART_FILE) for m in months]
+    dataset = ds.dataset(paths, format="parquet")
+    start = datetime.datetime.combine(start_date, datetime.time.min)
+    end = datetime.datetime.combine(end_date, datetime.time.max)
+    row_filter = (ds.field(DATE_COLUMN) >= pa.scalar(start)) & (ds.field(DATE_COLUMN) <= pa.scalar(end))
+    table = dataset.to_table(columns=columns, filter=row_filter)
+    return table.to_pandas()
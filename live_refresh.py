@@ -0,0 +1,58 @@
+"""Live mode: keep the page current without reloading it.
+
+A small fragment polls the cached snapshot on an interval and compares each
+section's data version with the one this session last rendered. Nothing is
+redrawn until a version changes; then the page reruns, and every section whose
+version is unchanged gets its figure back from ``cached_figure``. Streamlit
+sends an unchanged element as a short reference to the copy the browser
+already holds, so only the changed charts are rebuilt and pushed.
+"""
+import streamlit as st
+
+import data_store
+
+LIVE_INTERVALS = {"15 s": 15, "30 s": 30, "1 min": 60, "5 min": 300}
+GAUGE_ROWS = {"batch 3 gauge": "W1:Z2", "batch 2 gauge": "W3:Z3", "batch 4 gauge": "W4:Z4"}
+
+
+def section_versions(snapshot, dashboard_values):
+    """Data version of every live section, derived from the cached snapshot"""
+    versions = {
+        "scorecards": data_store.data_version(dashboard_values["X8:Y8"], dashboard_values["AA2:AB4"]),
+        "trend": snapshot.version,
+        "distribution": data_store.data_version(dashboard_values[data_store.DISTRIBUTION_RANGE]),
+        "monthly": data_store.data_version(dashboard_values["X15:Z27"]),
+    }
+    for section, row in GAUGE_ROWS.items():
+        versions[section] = data_store.data_version(dashboard_values["W1:Z1"], dashboard_values[row])
+    return versions
+
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def cached_figure(section, version, _build):
+    """Figure for one section at one data version, built on first use"""
+    return _build()
+
+
+def remember_rendered(versions):
+    """Record the section versions this session has just drawn"""
+    st.session_state.live_versions = versions
+
+
+def _poll():
+    versions = section_versions(data_store.current_snapshot(), data_store.load_dashboard_values())
+    if versions != st.session_state.get("live_versions"):
+        st.rerun(scope="app")
+
+
+def live_controls():
+    """Sidebar switch for live mode; returns the poll interval in seconds, or None when off"""
+    if not st.sidebar.toggle("Live mode", key="live_mode", help="Update charts as new assemblies sync"):
+        return None
+    label = st.sidebar.select_slider("Refresh every", options=list(LIVE_INTERVALS), value="30 s", key="live_interval")
+    return LIVE_INTERVALS[label]
+
+
+def start_polling(interval):
+    """Poll the cached data every interval seconds; must run after remember_rendered"""
+    st.fragment(_poll, run_every=interval)()
@@ -0,0 +1,242 @@
+"""Concurrent-session load test for streamlit_app.py.
+
+Runs N simulated browser sessions in parallel against a local stand-in for
+Google Sheets (see fake_sheets.py), scripts the interactions floor users
+make (login, device type switches, date range changes) and reports rerun
+latency percentiles, upstream API calls per interaction and server CPU and
+memory.
+
+Usage:
+    python load_test.py --sessions 8 --rounds 5 --latency-ms 150 --rows 20000
+"""
+import argparse
+import datetime
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import magic
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+
+import data_store
+import fake_sheets
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+LOAD_TEST_USER = ("loadtest", "loadtest")
+QUICK_DATE_OPTIONS = ["This Week", "This Month", "This Quarter"]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of samples (pct in 0..100)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def load_test_secrets():
+    """Process-wide secrets shared by every simulated session, as on a real server
+
+    AppTest swaps st.secrets per run when given its own secrets, which races
+    between concurrent sessions, so the sessions are started without any.
+    """
+    secrets = Secrets()
+    secrets._secrets = {
+        "USER_CREDENTIALS": {LOAD_TEST_USER[0]: LOAD_TEST_USER[1]},
+        "GOOGLE_SHEETS_CREDENTIALS": {},
+    }
+    return secrets
+
+
+def _serialized(func):
+    # ast.parse is not safe to call from several threads at once on CPython 3.11
+    lock = threading.Lock()
+
+    def wrapper(*args, **kwargs):
+        with lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def new_session(app, timeout):
+    return AppTest.from_file(os.path.join(APP_DIR, app), default_timeout=timeout)
+
+
+def _open_page(at):
+    pass
+
+
+def _login(at):
+    at.text_input[0].set_value(LOAD_TEST_USER[0])
+    at.text_input[1].set_value(LOAD_TEST_USER[1])
+    at.button[0].click()
+
+
+def _date_option(at):
+    return next(r for r in at.radio if r.label == "Quick Select Date Range")
+
+
+def _apply_filters(at):
+    # The trend filters live in a form: changes take effect with its submit button
+    at.button(key="apply_filters").click()
+
+
+def _switch_device(rnd):
+    def interact(at):
+        widget = at.multiselect(key="device_type")
+        widget.set_value(rnd.sample(widget.options, rnd.randint(1, len(widget.options))))
+        _apply_filters(at)
+    return interact
+
+
+def _quick_range(rnd):
+    def interact(at):
+        _date_option(at).set_value(rnd.choice(QUICK_DATE_OPTIONS))
+        _apply_filters(at)
+    return interact
+
+
+def _custom_mode(at):
+    _date_option(at).set_value("Custom")
+    _apply_filters(at)
+
+
+def _custom_range(rnd):
+    def interact(at):
+        days_back = rnd.choice([7, 30, 90, 365, 700])
+        today = datetime.date.today()
+        at.date_input(key="custom_range").set_value((today - datetime.timedelta(days=days_back), today))
+        _apply_filters(at)
+    return interact
+
+
+def session_script(rnd, rounds):
+    """Interactions for one session: opening the page, logging in, then rounds of filter changes
+
+    Each step changes widgets and is followed by exactly one timed rerun.
+    """
+    yield "open page", _open_page
+    yield "login", _login
+    for _ in range(rounds):
+        yield "device switch", _switch_device(rnd)
+        yield "quick range", _quick_range(rnd)
+        yield "custom mode", _custom_mode
+        yield "custom range", _custom_range(rnd)
+
+
+def run_session(session_id, args, results, errors):
+    rnd = random.Random(args.seed + session_id)
+    at = new_session(args.app, args.timeout)
+    for name, interaction in session_script(rnd, args.rounds):
+        try:
+            interaction(at)
+            started = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - started
+        except Exception as exc:  # keep the other sessions running
+            errors.append((session_id, name, repr(exc)))
+            return
+        if at.exception:
+            errors.append((session_id, name, at.exception[0].message))
+            return
+        results.append((name, elapsed))
+
+
+def _rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def run_load_test(args):
+    client = fake_sheets.FakeClient(fake_sheets.synthetic_workbook(rows=args.rows, seed=args.seed),
+                                    latency=args.latency_ms / 1000)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    results, errors = [], []
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    wall_started = time.perf_counter()
+    # Fresh data directories: a snapshot left by an earlier run is never reused, and the synthetic
+    # rows never touch the real Parquet history or the queue of entries waiting for Sheet2
+    with tempfile.TemporaryDirectory() as data_dir, \
+            mock.patch.object(data_store, "SNAPSHOT_DIR", os.path.join(data_dir, "snapshot")), \
+            mock.patch.object(data_store, "HISTORY_DIR", os.path.join(data_dir, "assembly_history")), \
+            mock.patch.object(data_store, "ENTRY_QUEUE_PATH", os.path.join(data_dir, "entry_queue.sqlite")), \
+            fake_sheets.patched(client), \
+            mock.patch.object(st, "secrets", load_test_secrets()), \
+            mock.patch.object(magic, "add_magic", _serialized(magic.add_magic)), \
+            patch_config_options({"global.appTest": True}):
+        # AppTest patches config.get_option per run and concurrent runs unwind each other's
+        # patches; holding the option for the whole test keeps widget format functions registered
+        threads = [threading.Thread(target=run_session, args=(i, args, results, errors))
+                   for i in range(args.sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - wall_started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    return {
+        "results": results,
+        "errors": errors,
+        "api_calls": len(client.log),
+        "wall": wall,
+        "cpu": cpu,
+        "peak_rss_mb": _rss_mb(),
+    }
+
+
+def print_report(report, args):
+    results = report["results"]
+    print(f"Sessions: {args.sessions}  rounds: {args.rounds}  rows: {args.rows}  "
+          f"injected latency: {args.latency_ms} ms")
+    print(f"{'interaction':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    groups = {}
+    for name, elapsed in results:
+        groups.setdefault(name, []).append(elapsed * 1000)
+    groups["all"] = [elapsed * 1000 for _, elapsed in results]
+    for name, samples in groups.items():
+        if samples:
+            print(f"{name:<16}{len(samples):>7}{percentile(samples, 50):>10.1f}{percentile(samples, 95):>10.1f}"
+                  f"{percentile(samples, 99):>10.1f}{statistics.fmean(samples):>10.1f}")
+
+    interactions = len(results) or 1
+    print(f"Upstream API calls: {report['api_calls']} ({report['api_calls'] / interactions:.2f} per interaction)")
+    print(f"Wall time: {report['wall']:.1f} s  CPU time: {report['cpu']:.1f} s  "
+          f"CPU utilisation: {100 * report['cpu'] / report['wall']:.0f}% of one core")
+    print(f"Peak RSS: {report['peak_rss_mb']:.0f} MB  "
+          f"Throughput: {len(results) / report['wall']:.1f} reruns/s")
+    for session_id, name, message in report["errors"]:
+        print(f"Session {session_id} failed during {name}: {message}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="streamlit_app.py", help="Streamlit script to load test")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent simulated sessions")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds of filter changes per session")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Injected latency per upstream call")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows in the synthetic Sheet2")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-rerun timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args)
+    print_report(report, args)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Opt-in profiler for the next few reruns of the dashboard.
+
+An admin (a username listed under ``ADMIN_USERS`` in secrets) arms it from
+the sidebar. Each of the next N reruns is profiled with cProfile from
+``start()`` near the top of the script to ``stop()`` at the end, and the
+results are merged into one pstats profile. The sidebar then shows the
+hottest functions and offers the profile for download. Runs that end early
+(``st.stop``, ``st.rerun``) are discarded.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import time
+
+import pandas as pd
+import streamlit as st
+
+DEFAULT_RERUNS = 5
+TOP_FUNCTIONS = 15
+
+
+def is_admin(username):
+    """True when username may use the profiler"""
+    return username is not None and username in st.secrets.get("ADMIN_USERS", [])
+
+
+def profiler_controls():
+    """Sidebar expander to arm the profiler for the next N reruns"""
+    with st.sidebar.expander("⏱️ Profiler"):
+        reruns = st.number_input("Reruns to profile", min_value=1, max_value=50, value=DEFAULT_RERUNS,
+                                 key="profile_reruns")
+        if st.button("Profile next reruns", key="profile_arm"):
+            st.session_state.profile_remaining = int(reruns)
+            st.session_state.profile_stats = None
+            st.session_state.profile_wall = []
+        remaining = st.session_state.get("profile_remaining", 0)
+        if remaining:
+            st.caption(f"Profiling: {remaining} rerun(s) left")
+
+
+def start():
+    """Begin profiling this rerun if the session has reruns left to profile"""
+    abandoned = st.session_state.pop("profile_active", None)
+    if abandoned is not None:
+        # A previous run ended early: stop its profiler so it does not slow later runs, and drop it
+        abandoned[0].disable()
+    if st.session_state.get("profile_remaining", 0) <= 0:
+        return
+    profile = cProfile.Profile()
+    st.session_state.profile_active = (profile, time.perf_counter())
+    profile.enable()
+
+
+def stop():
+    """Finish profiling this rerun and merge it into the session's profile"""
+    active = st.session_state.pop("profile_active", None)
+    if active is None:
+        return
+    profile, started = active
+    profile.disable()
+    st.session_state.profile_wall = st.session_state.get("profile_wall", []) + [time.perf_counter() - started]
+    stats = st.session_state.get("profile_stats")
+    if stats is None:
+        st.session_state.profile_stats = pstats.Stats(profile)
+    else:
+        stats.add(profile)
+    st.session_state.profile_remaining -= 1
+
+
+def hottest_functions(stats, limit=TOP_FUNCTIONS):
+    """Top functions by cumulative time as a table"""
+    rows = []
+    for (filename, line, name), (calls, _, own_time, cumulative, _) in stats.stats.items():
+        rows.append({"Function": f"{name} ({filename.rsplit('/', 1)[-1]}:{line})", "Calls": calls,
+                     "Own s": round(own_time, 4), "Cumulative s": round(cumulative, 4)})
+    table = pd.DataFrame(rows)
+    return table.sort_values("Cumulative s", ascending=False).head(limit) if not table.empty else table
+
+
+def profile_report():
+    """Sidebar summary of the collected profile with pstats and text downloads"""
+    stats = st.session_state.get("profile_stats")
+    if stats is None or st.session_state.get("profile_remaining", 0) > 0:
+        return
+    wall = st.session_state.get("profile_wall", [])
+    with st.sidebar.expander("⏱️ Profile results", expanded=True):
+        st.caption(f"{len(wall)} rerun(s), mean {1000 * sum(wall) / max(len(wall), 1):.0f} ms")
+        st.dataframe(hottest_functions(stats), hide_index=True, use_container_width=True)
+
+        # pstats format: open with pstats.Stats(path), snakeviz or tuna
+        st.download_button("Download profile (.prof)", marshal.dumps(stats.stats),
+                           file_name="dashboard.prof", mime="application/octet-stream")
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats("cumulative").print_stats(100)
+        st.download_button("Download report (.txt)", text.getvalue(), file_name="dashboard_profile.txt",
+                           mime="text/plain")
@@ -0,0 +1,98 @@
+"""Rolling yield and failure-rate analytics per batch and device type.
+
+Sheet2 rows are reduced once to a daily series of boards consumed and boards
+failed per (batch, device type, day). ``DailySeries`` extends that series
+incrementally when a sync only appended rows (the rows counted before are
+unchanged), and ``rolling_metrics`` derives
+daily and rolling-window throughput and failure rates from it with vectorized
+window operations over a day-by-group table.
+"""
+import threading
+
+import pandas as pd
+
+DATE_COLUMN = "Date of Assambly"
+STATUS_COLUMN = "Status"
+FAILED_STATUSES = frozenset({"failed", "fail", "rejected", "scrap", "scrapped"})
+GROUP_COLUMNS = ("Batch", "Device Type")
+WINDOWS = (7, 30)
+
+
+def daily_counts(df):
+    """Boards and failed boards per group and day, indexed by (*groups, day)"""
+    groups = [c for c in GROUP_COLUMNS if c in df.columns]
+    if STATUS_COLUMN in df.columns:
+        failed = df[STATUS_COLUMN].astype(str).str.strip().str.lower().isin(FAILED_STATUSES)
+    else:
+        failed = pd.Series(False, index=df.index)
+    frame = pd.DataFrame({
+        **{c: df[c].astype(str) for c in groups},
+        "day": pd.to_datetime(df[DATE_COLUMN], errors="coerce").dt.normalize(),
+        "boards": 1,
+        "failed": failed.astype(int),
+    }).dropna(subset=["day"])
+    return frame.groupby([*groups, "day"]).sum()
+
+
+def _row_hashes(df):
+    # Only the columns the counts depend on; summing the hashes ignores row order, as the counts do
+    columns = [c for c in (DATE_COLUMN, STATUS_COLUMN, *GROUP_COLUMNS) if c in df.columns]
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+class DailySeries:
+    """Daily per-group counts, extended in place of a rebuild when Sheet2 only grew"""
+
+    def __init__(self):
+        self.counts = None
+        self.rows_seen = 0
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    def update(self, df):
+        """Fold the rows of df not seen yet into the series and return it
+
+        The rows already counted are compared by a fingerprint of their
+        date, status and group columns, so an edit to an older row (e.g. a
+        status corrected to Failed) rebuilds the series.
+        """
+        with self._lock:
+            hashes = _row_hashes(df)
+            appended = (self.counts is not None and len(df) >= self.rows_seen
+                        and hashes[:self.rows_seen].sum() == self._fingerprint)
+            if not appended:
+                self.counts = daily_counts(df)
+            elif len(df) > self.rows_seen:
+                new_counts = daily_counts(df.iloc[self.rows_seen:])
+                self.counts = self.counts.add(new_counts, fill_value=0).astype(int)
+            self.rows_seen = len(df)
+            self._fingerprint = hashes.sum()
+            return self.counts
+
+
+def rolling_metrics(counts, by="Batch", windows=WINDOWS):
+    """Daily and rolling throughput and failure rate per value of by
+
+    Returns a frame indexed by calendar day (days without assemblies count as
+    zero) with a (metric, group) column MultiIndex. Throughput is good boards
+    per day; failure rate is failed boards over boards consumed in the window.
+    """
+    if counts is None or counts.empty or by not in counts.index.names:
+        return pd.DataFrame()
+    series = counts.groupby([by, "day"]).sum()
+    boards = series["boards"].unstack(by, fill_value=0)
+    failed = series["failed"].unstack(by, fill_value=0)
+    calendar = pd.date_range(boards.index.min(), boards.index.max(), freq="D")
+    boards = boards.reindex(calendar, fill_value=0)
+    failed = failed.reindex(calendar, fill_value=0)
+
+    metrics = {
+        "throughput": boards - failed,
+        "failure_rate": failed / boards.where(boards > 0),
+    }
+    for window in windows:
+        boards_window = boards.rolling(window, min_periods=1).sum()
+        failed_window = failed.rolling(window, min_periods=1).sum()
+        metrics[f"throughput_{window}d"] = (boards_window - failed_window) / window
+        metrics[f"failure_rate_{window}d"] = failed_window / boards_window.where(boards_window > 0)
+    return pd.concat(metrics, axis=1)
@@ -0,0 +1,190 @@
+"""Assembly counts rolled up hour → shift → day → week → month.
+
+The pyramid is built once per data snapshot: rows are counted per hour (or
+per day when the sheet has no times of day) and device type/batch, and each
+coarser level is summed from the level below it rather than from the raw
+rows. The trend view then reads the level for the chosen granularity and
+only sums the selected device types and batches over the requested dates;
+the first and last periods, which can run past those dates, are recounted
+from the finest level so only assemblies on the selected dates are counted.
+
+Shifts are named by their start hour. A shift that crosses midnight belongs
+to the day it started, so 02:00 on the 19th counts towards the night shift of
+the 18th.
+"""
+import copy
+import datetime
+
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = "Date of Assambly"
+GROUP_COLUMNS = ("Device Type", "Batch")
+# (name, start hour), in order through the production day
+SHIFTS = (("Shift 1", 6), ("Shift 2", 14), ("Shift 3", 22))
+GRANULARITIES = ("Hour", "Shift", "Day", "Week", "Month")
+# Levels are built from the one below them
+PARENTS = {"Shift": "Hour", "Day": "Shift", "Week": "Day", "Month": "Day"}
+EDGE_SPAN = pd.Timedelta(days=33)
+
+
+def shift_start(timestamps):
+    """Start time of the shift each timestamp falls in"""
+    timestamps = pd.Series(timestamps)
+    day = timestamps.dt.normalize()
+    hour = timestamps.dt.hour
+    starts = sorted(start for _, start in SHIFTS)
+    # Hours before the first shift start belong to the last shift of the day before
+    result = day - pd.Timedelta(days=1) + pd.Timedelta(hours=starts[-1])
+    for start in starts:
+        result = result.mask(hour >= start, day + pd.Timedelta(hours=start))
+    return result
+
+
+def shift_name(start):
+    """Name of the shift starting at a timestamp"""
+    return dict((hour, name) for name, hour in SHIFTS).get(start.hour, f"{start.hour:02d}:00")
+
+
+def period_start(timestamps, granularity):
+    """First instant of the period (of the given granularity) each timestamp falls in"""
+    timestamps = pd.Series(timestamps)
+    if granularity == "Hour":
+        return timestamps.dt.floor("h")
+    if granularity == "Shift":
+        return shift_start(timestamps)
+    if granularity == "Day":
+        # A night shift starting on the 18th counts towards the 18th
+        return timestamps.dt.normalize()
+    if granularity == "Week":
+        day = timestamps.dt.normalize()
+        return day - pd.to_timedelta(day.dt.weekday, unit="D")
+    if granularity == "Month":
+        return timestamps.dt.to_period("M").dt.start_time
+    raise ValueError(f"Unknown granularity {granularity!r}")
+
+
+def period_label(start, granularity):
+    """Axis label of the period starting at start"""
+    if granularity == "Hour":
+        return start.strftime("%Y-%m-%d %H:00")
+    if granularity == "Shift":
+        return f"{start:%Y-%m-%d} {shift_name(start)}"
+    if granularity == "Week":
+        return f"Week of {start:%Y-%m-%d}"
+    if granularity == "Month":
+        return start.strftime("%Y-%m")
+    return start.strftime("%Y-%m-%d")
+
+
+def has_times(dates):
+    """True when any date carries a time of day"""
+    dates = pd.Series(dates).dropna()
+    return bool((dates != dates.dt.normalize()).any())
+
+
+def count_rows(df, granularity):
+    """Row counts per (period, *groups) for df at one granularity"""
+    groups = [c for c in GROUP_COLUMNS if c in df.columns]
+    dates = df[DATE_COLUMN].dropna()
+    frame = pd.DataFrame({
+        "period": period_start(dates, granularity).to_numpy(),
+        **{c: df.loc[dates.index, c].astype(str).to_numpy() for c in groups},
+    })
+    return frame.groupby(["period", *groups]).size().rename("count")
+
+
+class RollupPyramid:
+    """Counts per period and device type/batch at every granularity the data supports"""
+
+    def __init__(self, df, base=None):
+        self.levels = {}
+        if DATE_COLUMN not in df.columns:
+            return
+        base = base or ("Hour" if has_times(df[DATE_COLUMN]) else "Day")
+        self.levels[base] = count_rows(df, base)
+        for granularity in GRANULARITIES[GRANULARITIES.index(base) + 1:]:
+            child = self.levels[PARENTS[granularity]]
+            periods = period_start(child.index.get_level_values("period"), granularity)
+            index = [periods.to_numpy(), *(child.index.get_level_values(i) for i in range(1, child.index.nlevels))]
+            self.levels[granularity] = child.groupby(index).sum().rename_axis(child.index.names)
+
+    def extended(self, df):
+        """New pyramid adding the rows of df to these counts"""
+        added = RollupPyramid(df, self.base)
+        result = copy.copy(self)
+        result.levels = {
+            granularity: level.add(added.levels[granularity], fill_value=0).astype(int)
+            for granularity, level in self.levels.items()
+        }
+        return result
+
+    @property
+    def base(self):
+        """Finest granularity, the level built from the rows"""
+        return next(iter(self.levels), None)
+
+    @property
+    def granularities(self):
+        """Granularities available, finest first"""
+        return [g for g in GRANULARITIES if g in self.levels]
+
+    def counts(self, granularity, start_date, end_date, filters=None):
+        """Assemblies per period of granularity dated start_date..end_date, for the filtered groups
+
+        filters maps a group column to the values to keep (None keeps all).
+        Only rows on the selected dates are counted, as when the rows are
+        selected first and passed to rollup(): periods that run past either
+        date are recounted from the finest level. Returns a Series indexed
+        by period start, holding only periods with assemblies.
+        """
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(datetime.datetime.combine(end_date, datetime.time.max))
+        first, last = self.period_of([start, end], granularity)
+
+        # Periods strictly between the two edge periods lie wholly inside the dates
+        level = self.levels[granularity]
+        periods = level.index.get_level_values("period")
+        inner = level[(periods > first) & (periods < last) & _group_mask(level, filters)]
+
+        base = self.levels[self.base]
+        base_periods = base.index.get_level_values("period")
+        mask = (base_periods >= start) & (base_periods <= end) & _group_mask(base, filters)
+        # No period spans more than a month plus a night shift
+        near_edge = (base_periods < start + EDGE_SPAN) | (base_periods > end - EDGE_SPAN)
+        edge = base[mask & near_edge]
+        edge_periods = self.period_of(edge.index.get_level_values("period"), granularity)
+        edge = pd.Series(edge.to_numpy(), index=edge_periods.to_numpy())[edge_periods.isin([first, last]).to_numpy()]
+
+        counts = pd.concat([inner.groupby(level="period").sum(), edge.groupby(level=0).sum()])
+        return counts.groupby(level=0).sum().rename_axis("period").rename("count")
+
+    def period_of(self, timestamps, granularity):
+        """Period start at granularity of each timestamp, assigned through the levels in between"""
+        path = [granularity]
+        while path[-1] != self.base:
+            path.append(PARENTS[path[-1]])
+        periods = pd.Series(timestamps)
+        for level in reversed(path):
+            periods = period_start(periods, level)
+        return periods
+
+
+def _group_mask(level, filters):
+    mask = np.ones(len(level), dtype=bool)
+    for column, values in (filters or {}).items():
+        if values is not None and column in level.index.names:
+            mask &= level.index.get_level_values(column).isin([str(v) for v in values])
+    return mask
+
+
+def rollup(df, granularity, base=None):
+    """Assemblies per period of granularity for rows the pyramid cannot filter (e.g. by PWA number)
+
+    Pass the snapshot pyramid's finest granularity as base so shifts and
+    days are assigned the same way as in the pyramid.
+    """
+    if df.empty:
+        return pd.Series(dtype=int, name="count")
+    level = RollupPyramid(df, base).levels[granularity]
+    return level.groupby(level="period").sum()
@@ -0,0 +1,53 @@
+"""Worksheet handles of one spreadsheet, looked up once and kept by title.
+
+``spreadsheet.worksheet(title)`` fetches the whole spreadsheet metadata on
+every call. SheetHandles reads that metadata once with ``worksheets()`` and
+serves every later lookup from memory. The handles are only reloaded when
+the spreadsheet's structure no longer matches them: a title that is not in
+the cached metadata, or a read the API rejects because the sheet behind a
+handle was renamed or deleted.
+"""
+import gspread
+
+# Status the Sheets API answers with when a range names a sheet that no longer exists
+STALE_RANGE_STATUS = 400
+
+
+class SheetHandles:
+    """Worksheets of a spreadsheet keyed by title, refreshed when its structure changes"""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.refresh()
+
+    def refresh(self):
+        """Reload the worksheet list with one metadata request"""
+        self.handles = {ws.title: ws for ws in self.spreadsheet.worksheets()}
+
+    def _handle(self, title):
+        handle = self.handles.get(title)
+        if handle is None:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return handle
+
+    def worksheet(self, title):
+        """Handle for title; reloads the metadata once when the title is unknown"""
+        if title not in self.handles:
+            self.refresh()
+        return self._handle(title)
+
+    def _read(self, title, method, *args):
+        try:
+            return getattr(self.worksheet(title), method)(*args)
+        except gspread.exceptions.APIError as e:
+            if e.code != STALE_RANGE_STATUS:
+                raise
+        # The sheet was renamed or removed since the handles were loaded
+        self.refresh()
+        return getattr(self._handle(title), method)(*args)
+
+    def get_values(self, title, range_name=None):
+        return self._read(title, "get_values", range_name)
+
+    def get_all_records(self, title):
+        return self._read(title, "get_all_records")
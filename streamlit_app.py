@@ -1,10 +1,20 @@
 import streamlit as st
 import pandas as pd
-import gspread
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import datetime
-from google.oauth2.service_account import Credentials
+
+import assembly_export
+import chart_payload
+import data_store
+import entry_queue
+import forecast
+import live_refresh
+import profiler
+import rolling_analytics
+import rollups
+import warmup
 
 
 # Set Page Config
@@ -54,44 +64,49 @@ else:
         st.session_state.username = "dev_user"
 
 # ---- MAIN APP ----
+# Profile this rerun when an admin armed the profiler (stopped at the end of the script)
+profiler.start()
+
 st.sidebar.button("Logout", on_click=logout)
 st.sidebar.write(f"👤 Logged in as: `{st.session_state.username}`")
+warmup.readiness_indicator()
+if profiler.is_admin(st.session_state.username):
+    profiler.profiler_controls()
+live_interval = live_refresh.live_controls()
+chart_payload.payload_controls()
 
 st.title("📊 Device Manufacturing and Assembly Dashboard")
 
 
-# ✅ Define the correct OAuth Scopes
-SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive.file",
-    "https://www.googleapis.com/auth/drive"
-]
-
-# ✅ Load credentials from secrets.toml
-credentials_dict = st.secrets["GOOGLE_SHEETS_CREDENTIALS"]
-
-# ✅ Authenticate using correct scopes
-creds = Credentials.from_service_account_info(credentials_dict, scopes=SCOPES)
-client = gspread.authorize(creds)
+# ✅ DashBoard ranges are read together once per sync and shared by all sessions
+dashboard_values = data_store.load_dashboard_values()
 
-# ✅ Open Google Sheet
-sheet_url = "https://docs.google.com/spreadsheets/d/1iWmEDXzfoqRPenAePMBOPSR-NCwelPCU-yZcQOyTltA/edit#gid=451421278"
-spreadsheet = client.open_by_url(sheet_url)
-worksheet = spreadsheet.worksheet("Sheet2")
-dashboard_worksheet = spreadsheet.worksheet("DashBoard")
-
-# ✅ Read data from Google Sheets
-data = worksheet.get_all_records()
-df = pd.DataFrame(data)
-
-# ✅ Trim spaces from column names
-df.columns = df.columns.str.strip()
+# ✅ Recent assembly data stays in memory; older months are read from Parquet on demand.
+# Entries recorded in the app are overlaid until a sync has read them back from Sheet2.
+snapshot = data_store.current_snapshot()
+data_store.start_entry_flusher()
+df = snapshot.hot
 
 st.write("### Inventory Overview")
 
 # ✅ Fetch data for PWA Inventory scorecards
-scorecard_data = dashboard_worksheet.get_values("X8:Y8")
-additional_scorecards = dashboard_worksheet.get_values("AA2:AB4")
+scorecard_data = dashboard_values["X8:Y8"]
+additional_scorecards = dashboard_values["AA2:AB4"]
+
+def scorecard_figure(label, value, color):
+    fig_scorecard = go.Figure(go.Indicator(
+        mode="number",
+        value=value,
+        title={"text": label, "font": {"size": 18}},  # Reduce title size
+        number={"font": {"size": 48, "color": color}},  # Adjusted number size
+    ))
+    # Reduce margins and set a fixed height
+    fig_scorecard.update_layout(
+        margin=dict(l=0, r=0, t=0, b=0),  # Remove all margins
+        height=150  # Force smaller height to reduce spacing
+    )
+    return fig_scorecard
+
 
 # 🔹 Create four columns for scorecards
 col1, col2, col3, col4 = st.columns(4)
@@ -100,18 +115,9 @@ col1, col2, col3, col4 = st.columns(4)
 if scorecard_data:
     with col1:
         label, value = scorecard_data[0][0], int(scorecard_data[0][1])
-        fig_scorecard = go.Figure(go.Indicator(
-            mode="number",
-            value=value,
-            title={"text": label, "font": {"size": 18}},  # Reduce title size
-            number={"font": {"size": 48, "color": "#636EFA"}},  # Adjusted number size
-        ))
-        # Reduce margins and set a fixed height
-        fig_scorecard.update_layout(
-            margin=dict(l=0, r=0, t=0, b=0),  # Remove all margins
-            height=150  # Force smaller height to reduce spacing
-        )
-        st.plotly_chart(fig_scorecard, use_container_width=True, config={"displayModeBar": False})
+        fig_scorecard = live_refresh.cached_figure("scorecard", (label, value, "#636EFA"),
+                                                   lambda: scorecard_figure(label, value, "#636EFA"))
+        chart_payload.plotly_chart(label, fig_scorecard, use_container_width=True, config={"displayModeBar": False})
 
 # 🔹 Display additional inventory scorecards in the remaining three columns
 if additional_scorecards:
@@ -121,26 +127,17 @@ if additional_scorecards:
         if i < len(cols):
             with cols[i]:
                 label, value = row[0], int(row[1])
-                fig_scorecard = go.Figure(go.Indicator(
-                    mode="number",
-                    value=value,
-                    title={"text": label, "font": {"size": 18}},  # Reduce title size
-                    number={"font": {"size": 48, "color": "#FFA600"}},  # Adjusted number size
-                ))
-                # Reduce margins and set a fixed height
-                fig_scorecard.update_layout(
-                    margin=dict(l=0, r=0, t=0, b=0),  # Remove all margins
-                    height=150  # Force smaller height to reduce spacing
-                )
-                st.plotly_chart(fig_scorecard, use_container_width=True, config={"displayModeBar": False})
+                fig_scorecard = live_refresh.cached_figure("scorecard", (label, value, "#FFA600"),
+                                                           lambda: scorecard_figure(label, value, "#FFA600"))
+                chart_payload.plotly_chart(label, fig_scorecard, use_container_width=True, config={"displayModeBar": False})
 # Fetch header row for both batches (W1:Z1)
-progress_labels = dashboard_worksheet.get_values("W1:Z1")
+progress_labels = dashboard_values["W1:Z1"]
 if progress_labels:
     labels = progress_labels[0]
 
 
 # ---- Fetch Data from Dashboard Sheet ----
-progress_data = dashboard_worksheet.get_values("W1:Z2")
+progress_data = dashboard_values["W1:Z2"]
 if progress_data:
     labels = progress_data[0]
     values = list(map(int, progress_data[1]))
@@ -154,47 +151,54 @@ if progress_data:
 col1, col2, col3 = st.columns([1, 1, 1])
 
 
+def gauge_figure(used_pwa, failed_pwa, total_pwa):
+    fig = go.Figure()
+    fig.add_trace(go.Indicator(
+        mode="gauge+number",
+        value=used_pwa,
+        number={'font': {'size': 24}},  # Smaller font
+        gauge={
+            'shape': "angular",
+            'axis': {
+                'range': [0, total_pwa],
+                'tickmode': "array",
+                'tickvals': [0, used_pwa, failed_pwa, total_pwa],
+                'tickfont': {'size': 16}  # Smaller ticks
+            },
+            'bar': {'color': "rgba(0,0,0,0)"},
+            'bgcolor': "rgba(0,0,0,0)",
+            'steps': [
+                {'range': [0, used_pwa], 'color': "#66cdfb"},
+                {'range': [used_pwa, failed_pwa], 'color': "#FF5733"},
+                {'range': [failed_pwa, total_pwa], 'color': "#D3D3D3"},
+            ],
+            'threshold': {
+                'line': {'color': "#D3D3D3", 'width': 0},
+                'thickness': 0
+            }
+        },
+        domain={'x': [0.1, 0.9], 'y': [0, 0.7]}  # Tighter bounds
+    ))
+
+    fig.update_layout(
+        margin=dict(t=10, b=10, l=10, r=10),
+        height=260,
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+    )
+    return fig
+
+
 def draw_gauge(col, title, used_pwa, failed_pwa, total_pwa):
     with col:
         percentage = (used_pwa / total_pwa) * 100 if total_pwa else 0
 
-        fig = go.Figure()
-        fig.add_trace(go.Indicator(
-            mode="gauge+number",
-            value=used_pwa,
-            number={'font': {'size': 24}},  # Smaller font
-            gauge={
-                'shape': "angular",
-                'axis': {
-                    'range': [0, total_pwa],
-                    'tickmode': "array",
-                    'tickvals': [0, used_pwa, failed_pwa, total_pwa],
-                    'tickfont': {'size': 16}  # Smaller ticks
-                },
-                'bar': {'color': "rgba(0,0,0,0)"},
-                'bgcolor': "rgba(0,0,0,0)",
-                'steps': [
-                    {'range': [0, used_pwa], 'color': "#66cdfb"},
-                    {'range': [used_pwa, failed_pwa], 'color': "#FF5733"},
-                    {'range': [failed_pwa, total_pwa], 'color': "#D3D3D3"},
-                ],
-                'threshold': {
-                    'line': {'color': "#D3D3D3", 'width': 0},
-                    'thickness': 0
-                }
-            },
-            domain={'x': [0.1, 0.9], 'y': [0, 0.7]}  # Tighter bounds
-        ))
-
-        fig.update_layout(
-            margin=dict(t=10, b=10, l=10, r=10),
-            height=260,
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-        )
+        # Rebuilt only when this batch's counts change
+        fig = live_refresh.cached_figure("gauge", (used_pwa, failed_pwa, total_pwa),
+                                         lambda: gauge_figure(used_pwa, failed_pwa, total_pwa))
 
         st.caption(title)
-        st.plotly_chart(fig, use_container_width=True)
+        chart_payload.plotly_chart(title, fig, use_container_width=True)
 
         # Add percentage line below
         st.markdown(
@@ -210,8 +214,8 @@ def draw_gauge(col, title, used_pwa, failed_pwa, total_pwa):
 draw_gauge(col2, "Batch 3 Invertory", used_pwa, failed_pwa, total_pwa)
 
 # 2nd Chart (Batch W3)
-progress_data = dashboard_worksheet.get_values("W1:Z1")
-count_data = dashboard_worksheet.get_values("W3:Z3")
+progress_data = dashboard_values["W1:Z1"]
+count_data = dashboard_values["W3:Z3"]
 if progress_data and count_data:
     labels = progress_data[0]
     values = list(map(int, count_data[0]))
@@ -221,8 +225,8 @@ if progress_data and count_data:
     draw_gauge(col1, "Batch 2 Inventory", used_pwa, failed_pwa, total_pwa)
 
 # 3rd Chart (Batch W4)
-label_row = dashboard_worksheet.get_values("W1:Z1")
-count_row = dashboard_worksheet.get_values("W4:Z4")
+label_row = dashboard_values["W1:Z1"]
+count_row = dashboard_values["W4:Z4"]
 if label_row and count_row:
     labels = label_row[0]
     values = list(map(int, count_row[0]))
@@ -252,16 +256,125 @@ st.markdown(
 )
 
 
+# --- ROLLING YIELD AND FAILURE RATE (from the cached daily series, next to the gauges) ---
+def rolling_figures(group_by, window):
+    metrics = rolling_analytics.rolling_metrics(snapshot.daily, by=group_by)
+    fig_failure_rate = go.Figure()
+    fig_throughput = go.Figure()
+    if not metrics.empty:
+        days = metrics.index.strftime("%Y-%m-%d")
+        for group in metrics[f"failure_rate_{window}d"].columns:
+            fig_failure_rate.add_trace(go.Scatter(
+                x=days,
+                y=metrics[(f"failure_rate_{window}d", group)] * 100,
+                mode="lines",
+                name=group,
+                line=dict(width=3),
+            ))
+            fig_throughput.add_trace(go.Scatter(
+                x=days,
+                y=metrics[(f"throughput_{window}d", group)],
+                mode="lines",
+                name=group,
+                line=dict(width=3),
+            ))
+    fig_failure_rate.update_layout(
+        title=f"{window}-day Failure Rate by {group_by}",
+        yaxis=dict(title="Failed PWA (%)", rangemode="tozero"),
+        legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5)
+    )
+    fig_throughput.update_layout(
+        title=f"{window}-day Throughput by {group_by}",
+        yaxis=dict(title="Good PWA per day", rangemode="tozero"),
+        legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5)
+    )
+    return fig_failure_rate, fig_throughput
+
+
+st.write("### Rolling Yield and Failure Rate")
+if snapshot.daily is not None and not snapshot.daily.empty:
+    col1, col2 = st.columns(2)
+    with col1:
+        rolling_group = st.radio("Group by", [c for c in rolling_analytics.GROUP_COLUMNS if c in snapshot.daily.index.names],
+                                 horizontal=True, key="rolling_group")
+    with col2:
+        rolling_window = st.radio("Window", rolling_analytics.WINDOWS, format_func=lambda w: f"{w} days",
+                                  horizontal=True, key="rolling_window")
+    if rolling_analytics.STATUS_COLUMN not in df.columns:
+        st.caption(f"Sheet2 has no \"{rolling_analytics.STATUS_COLUMN}\" column, so every board counts as used.")
+
+    fig_failure_rate, fig_throughput = live_refresh.cached_figure(
+        "rolling", data_store.data_version(snapshot.version, rolling_group, rolling_window),
+        lambda: rolling_figures(rolling_group, rolling_window))
+    with col1:
+        chart_payload.plotly_chart("Rolling Failure Rate", fig_failure_rate, use_container_width=True)
+    with col2:
+        chart_payload.plotly_chart("Rolling Throughput", fig_throughput, use_container_width=True)
+
+
+# --- INVENTORY DEPLETION FORECAST (fitted once per data version) ---
+def depletion_forecast(remaining):
+    today = datetime.date.today()
+    rates = forecast.consumption_rates(snapshot.daily, today=today)
+    forecast_df = forecast.forecast_depletion(remaining, rates, today=today)
+
+    fig_forecast = go.Figure()
+    colors = ["#636EFA", "#FFA600", "#00CC96", "#AB63FA", "#EF553B"]
+    for i, row in forecast_df.iterrows():
+        if pd.isna(row["Run-out date"]):
+            continue
+        color = colors[i % len(colors)]
+        if not pd.isna(row["Latest"]):
+            # Confidence band between the earliest and latest run-out dates
+            fig_forecast.add_trace(go.Scatter(
+                x=[today, row["Earliest"], row["Latest"], today],
+                y=[row["Remaining PWA"], 0, 0, row["Remaining PWA"]],
+                fill="toself",
+                fillcolor=f"rgba{tuple(int(color[1:][j:j+2], 16) for j in (0, 2, 4)) + (0.2,)}",
+                line=dict(width=0),
+                hoverinfo="none",
+                showlegend=False
+            ))
+        fig_forecast.add_trace(go.Scatter(
+            x=[today, row["Run-out date"]],
+            y=[row["Remaining PWA"], 0],
+            mode="lines+markers",
+            name=row["Batch"],
+            line=dict(width=3, color=color, dash="dash")
+        ))
+    fig_forecast.update_layout(
+        title="Projected Remaining PWA",
+        yaxis=dict(title="Remaining PWA", rangemode="tozero"),
+        legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5)
+    )
+    return forecast_df, fig_forecast
+
+
+st.write("### Inventory Depletion Forecast")
+remaining_pwa = forecast.remaining_inventory(dashboard_values)
+if remaining_pwa:
+    forecast_df, fig_forecast = live_refresh.cached_figure(
+        "forecast", data_store.data_version(snapshot.version, remaining_pwa, datetime.date.today()),
+        lambda: depletion_forecast(remaining_pwa))
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(forecast_df, use_container_width=True, hide_index=True, column_config={
+            "Run-out date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+            "Earliest": st.column_config.DateColumn(format="YYYY-MM-DD"),
+            "Latest": st.column_config.DateColumn(format="YYYY-MM-DD"),
+        })
+        st.caption(f"Rates fitted on the last {forecast.FIT_DAYS} days of assemblies; band is 95%.")
+    with col2:
+        chart_payload.plotly_chart("Inventory Depletion Forecast", fig_forecast, use_container_width=True)
+
+
 # --- DEVICE ASSEMBLY TREND DASHBOARD (Batch 3) ---
 st.write("### Device Assembly Trend")
 # Ensure the required columns exist
 required_columns = ["Date of Assambly", "Device Type", "PWA No"]
 if all(col in df.columns for col in required_columns):
     
-    # Convert Date column to datetime
-    df["Date of Assambly"] = pd.to_datetime(df["Date of Assambly"], errors="coerce")
-    
-    # Filter invalid dates
+    # Filter invalid dates (the snapshot already parsed the Date column)
     df = df.dropna(subset=["Date of Assambly"])
     
     col1, col2 = st.columns(2)
@@ -290,11 +403,10 @@ with col1:
     """,
     unsafe_allow_html=True
     )
-   # Tab selection for device type before date selection
-    device_types = df["Device Type"].unique()
-    if len(device_types) > 0:
-        selected_device = st.radio("Select Device Type", device_types, horizontal=True, key="device_type")
-    else:
+    # ✅ The filters are collected in one form and applied together on submit, so adjusting
+    # several of them costs one rerun instead of one per change
+    device_types = snapshot.device_types
+    if len(device_types) == 0:
         st.warning("No device types available.")
         st.stop()
 
@@ -303,10 +415,31 @@ with col1:
     start_of_week = today - datetime.timedelta(days=today.weekday())
     start_of_month = today.replace(day=1)
     start_of_quarter = today.replace(month=((today.month - 1) // 3) * 3 + 1, day=1)
-    
-    # Radio button for quick date selection
-    date_option = st.radio("Quick Select Date Range", ["Custom", "This Week", "This Month", "This Quarter"], horizontal=True)
-    
+    default_range = (today - datetime.timedelta(days=30), today)
+
+    with st.form("trend_filters", border=False):
+        # Device type selection before date selection (any combination)
+        selected_devices = st.multiselect("Select Device Type", device_types, default=device_types[:1], key="device_type")
+
+        # Optional batch and PWA number filters, combined with the device and date filters
+        selected_batches = None
+        if snapshot.batches:
+            selected_batches = st.multiselect("Select Batch", snapshot.batches, default=snapshot.batches, key="batch")
+        pwa_range = None
+        if snapshot.pwa_bounds and snapshot.pwa_bounds[0] < snapshot.pwa_bounds[1]:
+            pwa_range = st.slider("PWA No Range", *snapshot.pwa_bounds, value=snapshot.pwa_bounds, key="pwa_range")
+
+        # Radio button for quick date selection
+        date_option = st.radio("Quick Select Date Range", ["Custom", "This Week", "This Month", "This Quarter"], horizontal=True)
+
+        # A range picker validates in the browser: the end can never precede the start or pass today
+        custom_range = st.date_input("Custom Range", value=default_range, max_value=today, key="custom_range",
+                                     help="Used when Quick Select is Custom")
+        st.form_submit_button("Apply Filters", type="primary", key="apply_filters")
+
+    if pwa_range == snapshot.pwa_bounds:
+        pwa_range = None  # Full range selected: skip the range lookup
+
     if date_option == "This Week":
         start_date, end_date = start_of_week, today
     elif date_option == "This Month":
@@ -314,30 +447,28 @@ with col1:
     elif date_option == "This Quarter":
         start_date, end_date = start_of_quarter, today
     else:
-        col3, col4 = st.columns(2)
-        with col3:
-            start_date = st.date_input("From", today - datetime.timedelta(days=30))
-        with col4:
-            end_date = st.date_input("To", today)
-    
-    # Ensure start_date is before end_date
-    if start_date > end_date:
-        st.error("Start date cannot be after end date.")
-        st.stop()
-with col2:  
-    # Filter data based on selected device type and dates
-    filtered_df = df[(df["Device Type"] == selected_device) &
-                     (df["Date of Assambly"] >= pd.to_datetime(start_date)) &
-                     (df["Date of Assambly"] <= pd.to_datetime(end_date))]
-    
-    # Filter data for selected device type and remove non-manufacturing days
-    device_counts = filtered_df.groupby("Date of Assambly").size().reset_index(name="Count")
-    
-    # Keep only days where manufacturing occurred
-    device_counts = device_counts[device_counts["Count"] > 0]
+        # A range submitted halfway through picking (start day only) means that single day
+        custom_range = tuple(custom_range) or default_range
+        start_date, end_date = custom_range[0], custom_range[-1]
 
-    # Adjust bar width by treating dates as categorical
-    device_counts["Date of Assambly"] = device_counts["Date of Assambly"].astype(str)
+
+def trend_figure(selected_devices, selected_batches, pwa_range, start_date, end_date, granularity):
+    # Counts come from the rollup pyramid built once per snapshot; only a PWA number range,
+    # which the pyramid does not break down by, filters the rows themselves (bitmap indexes)
+    filters = {"Device Type": selected_devices, "Batch": selected_batches}
+    if pwa_range is None:
+        counts = snapshot.rollups.counts(granularity, start_date, end_date, filters)
+    else:
+        filtered_df = data_store.select_assembly_rows(snapshot, start_date, end_date, filters, pwa_range,
+                                                      columns=("Date of Assambly", "Device Type"))
+        counts = rollups.rollup(filtered_df, granularity, snapshot.rollups.base)
+
+    # Keep only periods where manufacturing occurred, labelled as categories to keep bars wide
+    device_counts = pd.DataFrame({
+        "Date of Assambly": [rollups.period_label(period, granularity) for period in counts.index],
+        "Count": counts.to_numpy(),
+    })
+    device_counts = device_counts[device_counts["Count"] > 0]
 
     # Create bar chart with rounded edges and emphasized data labels
     fig = go.Figure()
@@ -350,29 +481,53 @@ with col2:
     # Apply rounded corners
     fig.update_traces(marker=dict(cornerradius=10))
     
-    # Add circles around data labels for emphasis
-    for i, row in device_counts.iterrows():
-        fig.add_trace(go.Scatter(
-            x=[row["Date of Assambly"]],
-            y=[row["Count"]],
-            mode="markers+text",
-            marker=dict(size=30, color="#66cdfb", opacity=0.6),
-            text=[row["Count"]],
-            textfont=dict(size=14, color="white"),
-            textposition="middle center",
-            hoverinfo="none"
-        ))
+    # ✅ Add circles around data labels for emphasis (one trace for all bars)
+    fig.add_trace(go.Scatter(
+        x=device_counts["Date of Assambly"],
+        y=device_counts["Count"],
+        mode="markers+text",
+        marker=dict(size=30, color="#66cdfb", opacity=0.6),
+        text=device_counts["Count"],
+        textfont=dict(size=14, color="white"),
+        textposition="middle center",
+        hoverinfo="none"
+    ))
     
     # Improve layout
     fig.update_layout(
-        title=f"Device Assembly Trend for {selected_device}",
-        xaxis=dict(type='category', tickangle=-45),
+        title=f"Device Assembly Trend for {', '.join(map(str, selected_devices)) or 'no device type'}",
+        xaxis=dict(type='category', tickangle=-45, title=granularity),
         yaxis=dict(title="Count"),
         bargap=0.2, bargroupgap=0.02,
         showlegend=False
     )
-    
-    st.plotly_chart(fig)
+    return fig
+
+
+with col2:
+    # Outside the filter form: switching granularity only reads another level of the pyramid
+    granularities = snapshot.rollups.granularities
+    granularity = st.radio("Granularity", granularities, horizontal=True, key="trend_granularity",
+                           index=granularities.index("Day") if "Day" in granularities else 0)
+
+    # Recomputed only when the snapshot version, the filters or the granularity change
+    trend_version = data_store.data_version(snapshot.version, selected_devices, selected_batches,
+                                            pwa_range, start_date, end_date, granularity)
+    fig = live_refresh.cached_figure("trend", trend_version, lambda: trend_figure(
+        selected_devices, selected_batches, pwa_range, start_date, end_date, granularity))
+    chart_payload.plotly_chart("Device Assembly Trend", fig)
+
+    # ✅ Export the rows behind the chart; each file is built in chunks only when its button is clicked
+    export_filters = {"Device Type": selected_devices, "Batch": selected_batches}
+    for export_col, (export_format, (extension, mime)) in zip(st.columns(len(assembly_export.FORMATS)),
+                                                              assembly_export.FORMATS.items()):
+        export_col.download_button(
+            f"⬇️ Download {export_format}",
+            lambda export_format=export_format: assembly_export.export_file(
+                data_store.iter_assembly_rows(snapshot, start_date, end_date, export_filters, pwa_range),
+                export_format),
+            file_name=f"assembly_{start_date}_{end_date}.{extension}", mime=mime,
+            on_click="ignore", key=f"export_{extension}")
 
 
 # Display Data Preview from Sheet2
@@ -380,13 +535,50 @@ with col2:
 #entries_to_show = st.selectbox("Show entries", options=[50, 100, 200, len(df)], index=0)
 #st.dataframe(df.head(entries_to_show))
 
-# Fetch data from Sheet1
-worksheet2 = spreadsheet.worksheet("Sheet1")  # Fetching data from Sheet1
-data2 = worksheet2.get_values("A:I")
-df2 = pd.DataFrame(data2[1:], columns=data2[0])  # First row as header
-
-# Trim spaces from column names
-df2.columns = df2.columns.str.strip()
+# --- RECORD ASSEMBLY (queued locally, appended to Sheet2 in batches) ---
+st.write("### Record Assembly")
+
+
+def queue_assembly_entry():
+    """Queue the submitted entry; the rerun that follows already shows it in the charts"""
+    pwa_no = st.session_state.entry_pwa.strip()
+    if not pwa_no:
+        st.session_state.entry_message = ("error", "❌ Enter a PWA number.")
+        return
+    assembled = st.session_state.entry_date.isoformat()
+    if snapshot.rollups.base == "Hour":  # Only add a time of day when Sheet2 records times
+        assembled += f" {st.session_state.entry_time:%H:%M}"
+    record = {"Date of Assambly": assembled, "Device Type": st.session_state.entry_device,
+              "PWA No": pwa_no, "Batch": st.session_state.entry_batch}
+    if "Status" in df.columns:
+        record["Status"] = st.session_state.entry_status
+    data_store.queue_entries([record])
+    st.session_state.entry_message = ("success", f"✅ {pwa_no} recorded; it is written to Sheet2 within "
+                                                 f"{data_store.ENTRY_FLUSH_SECONDS} s.")
+
+
+with st.form("assembly_entry", clear_on_submit=True):
+    entry_cols = st.columns(6)
+    entry_cols[0].date_input("Assembly Date", value=datetime.date.today(), key="entry_date")
+    entry_cols[1].time_input("Time", value=datetime.datetime.now().time().replace(second=0, microsecond=0),
+                             key="entry_time", disabled=snapshot.rollups.base != "Hour")
+    entry_cols[2].selectbox("Device Type", snapshot.device_types, key="entry_device")
+    entry_cols[3].selectbox("Batch", snapshot.batches or ["Batch 3"], key="entry_batch")
+    entry_cols[4].text_input("PWA No", key="entry_pwa")
+    entry_cols[5].selectbox("Status", ["Used", "Failed"], key="entry_status", disabled="Status" not in df.columns)
+    st.form_submit_button("Add Entry", on_click=queue_assembly_entry, key="entry_submit")
+
+entry_message = st.session_state.pop("entry_message", None)
+if entry_message:
+    getattr(st, entry_message[0])(entry_message[1])
+queue_status = entry_queue.status(data_store.ENTRY_QUEUE_PATH)
+if queue_status["pending"]:
+    st.caption(f"{queue_status['pending']} entr{'y' if queue_status['pending'] == 1 else 'ies'} waiting for Sheet2"
+               + (f" (last error: {queue_status['last_error']})" if queue_status["last_error"] else ""))
+
+
+# Sheet1 is fetched with the cached snapshot (first row as header, column names trimmed)
+df2 = snapshot.sheet1
 
 # Display Data Preview from Sheet1
 #st.write("### Data Preview (Assembly Data):")
@@ -394,129 +586,56 @@ df2.columns = df2.columns.str.strip()
 #st.dataframe(df2.head(entries_to_show2))
 
 
-# --- PWA DISTRIBUTION DASHBOARD (Batch 4 above Batch 3) ---
+# --- PWA TRACEABILITY (hash index over Sheet1 and Sheet2, built once per snapshot) ---
+st.write("### PWA Traceability")
+trace_query = st.text_input("Search PWA No", placeholder="Full PWA number or its first characters", key="trace_query")
+if trace_query.strip():
+    trace_rows = snapshot.trace.lookup(trace_query)
+    if not trace_rows.empty:
+        st.dataframe(trace_rows, use_container_width=True, hide_index=True)
+    else:
+        matches = snapshot.trace.prefix(trace_query, limit=50)
+        if matches:
+            selected_pwa = st.selectbox(f"{len(matches)} matching PWA numbers", matches, key="trace_match")
+            st.dataframe(snapshot.trace.lookup(selected_pwa), use_container_width=True, hide_index=True)
+        else:
+            st.info("No PWA number matches this search.")
 
-st.write("### PWA Distribution")
 
-# --- BATCH 4 DATA (example: device types in X10:X14, counts in Y10:Y14) ---
-# Adjust the ranges below as per actual dashboard layout
+# --- PWA DISTRIBUTION DASHBOARD (all batches from one long-form table) ---
 
-# Fetch device types (assumed same as Batch 3, i.e., header row of W9:X13, column X)
-device_types_batch = dashboard_worksheet.get_values("W10:W13")
-device_types_batch = [item[0] for item in device_types_batch] if device_types_batch else []
+st.write("### PWA Distribution")
 
-# Fetch Batch 4 counts (Y10:Y14)
-batch4_counts = dashboard_worksheet.get_values("Y10:Y13")
-batch4_counts = [int(item[0]) if item and item[0] else 0 for item in batch4_counts] if batch4_counts else []
+DISTRIBUTION_COLORS = ["#FFA600", "#636EFA", "#EF553B", "#00CC96", "#AB63FA"]
 
-# Prepare DataFrame for Batch 4
-if device_types_batch and batch4_counts and len(device_types_batch) == len(batch4_counts):
-    df_dashboard4 = pd.DataFrame({
-        "Device Type": device_types_batch,
-        "Count": batch4_counts
-    })
 
-    col4_1, col4_2 = st.columns(2)
-    # Batch 4 Bar Chart
-    with col4_2:
-        fig_dashboard4 = go.Figure()
-        fig_dashboard4.add_trace(go.Bar(
-            x=df_dashboard4["Device Type"],
-            y=df_dashboard4["Count"],
-            marker=dict(color="#FFA600", opacity=0.9),
-        ))
-        fig_dashboard4.update_traces(marker=dict(cornerradius=10))
-
-        for i, row in df_dashboard4.iterrows():
-            fig_dashboard4.add_trace(go.Scatter(
-                x=[row["Device Type"]],
-                y=[row["Count"]],
-                mode="markers+text",
-                marker=dict(size=30, color="#FFA600", opacity=0.6),
-                text=[row["Count"]],
-                textfont=dict(size=14, color="white"),
-                textposition="middle center",
-                hoverinfo="none"
-            ))
-        fig_dashboard4.update_layout(
-            title="Batch 4 Distribution",
-            xaxis=dict(type='category', tickangle=0, title="Device Type"),
-            yaxis=dict(title="Count"),
-            bargap=0.2, bargroupgap=0.02,
-            showlegend=False
-        )
-        st.plotly_chart(fig_dashboard4, use_container_width=True)
-
-    # Batch 4 Doughnut Chart
-    with col4_1:
-        fig_doughnut4 = go.Figure()
-        fig_doughnut4.add_trace(go.Pie(
-            labels=df_dashboard4["Device Type"],
-            values=df_dashboard4["Count"],
+def distribution_figures(distribution):
+    # One grouped bar chart and one faceted doughnut chart, whatever the number of batches
+    batches = list(reversed(distribution["Batch"].unique()))  # Latest batch first
+    fig_bar = px.bar(distribution, x="Device Type", y="Count", color="Batch", barmode="group", text="Count",
+                     category_orders={"Batch": batches}, color_discrete_sequence=DISTRIBUTION_COLORS)
+    fig_bar.update_traces(marker=dict(cornerradius=10, opacity=0.9), textposition="outside")
+    fig_bar.update_layout(
+        title="PWA Distribution by Batch",
+        xaxis=dict(type='category', tickangle=0, title="Device Type"),
+        yaxis=dict(title="Count"),
+        bargap=0.2, bargroupgap=0.02,
+    )
+
+    fig_doughnut = make_subplots(rows=1, cols=len(batches), specs=[[{"type": "domain"}] * len(batches)],
+                                 subplot_titles=batches)
+    for i, batch in enumerate(batches):
+        counts = distribution[distribution["Batch"] == batch]
+        fig_doughnut.add_trace(go.Pie(
+            labels=counts["Device Type"],
+            values=counts["Count"],
+            name=batch,
             hole=0.4,
             marker=dict(colors=["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A"]),
             textinfo="percent+label"
-        ))
-        fig_doughnut4.update_layout(
-            title="Batch 4 Percentage Distribution",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.2,
-                xanchor="right",
-                x=0.85
-            )
-        )
-        st.plotly_chart(fig_doughnut4, use_container_width=True)
-
-# --- BATCH 3 DATA (Original code, just after Batch 4 section) ---
-dashboard_data = dashboard_worksheet.get_values("W9:X13")
-df_dashboard = pd.DataFrame(dashboard_data[1:], columns=dashboard_data[0])  # First row as header
-df_dashboard.columns = df_dashboard.columns.str.strip()
-
-col3_1, col3_2 = st.columns(2)
-# Bar Chart for Batch 3
-with col3_2:
-    fig_dashboard = go.Figure()
-    fig_dashboard.add_trace(go.Bar(
-        x=df_dashboard[df_dashboard.columns[0]],
-        y=pd.to_numeric(df_dashboard[df_dashboard.columns[1]], errors='coerce'),
-        marker=dict(color="#FFA600", opacity=0.9),
-    ))
-    fig_dashboard.update_traces(marker=dict(cornerradius=10))
-
-    for i, row in df_dashboard.iterrows():
-        fig_dashboard.add_trace(go.Scatter(
-            x=[row[df_dashboard.columns[0]]],
-            y=[pd.to_numeric(row[df_dashboard.columns[1]], errors='coerce')],
-            mode="markers+text",
-            marker=dict(size=30, color="#FFA600", opacity=0.6),
-            text=[row[df_dashboard.columns[1]]],
-            textfont=dict(size=14, color="white"),
-            textposition="middle center",
-            hoverinfo="none"
-        ))
-    fig_dashboard.update_layout(
-        title="Batch 3 Distribution",
-        xaxis=dict(type='category', tickangle=0, title=df_dashboard.columns[0]),
-        yaxis=dict(title=df_dashboard.columns[1]),
-        bargap=0.2, bargroupgap=0.02,
-        showlegend=False
-    )
-    st.plotly_chart(fig_dashboard, use_container_width=True)
-
-# Doughnut Chart for Batch 3
-with col3_1:
-    fig_doughnut = go.Figure()
-    fig_doughnut.add_trace(go.Pie(
-        labels=df_dashboard[df_dashboard.columns[0]],
-        values=pd.to_numeric(df_dashboard[df_dashboard.columns[1]], errors='coerce'),
-        hole=0.4,
-        marker=dict(colors=["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A"]),
-        textinfo="percent+label"
-    ))
+        ), row=1, col=i + 1)
     fig_doughnut.update_layout(
-        title="Batch 3 Percentage Distribution",
+        title="PWA Percentage Distribution by Batch",
         legend=dict(
             orientation="h",
             yanchor="bottom",
@@ -525,11 +644,26 @@ with col3_1:
             x=0.85
         )
     )
-    st.plotly_chart(fig_doughnut, use_container_width=True)
+    return fig_bar, fig_doughnut
+
+
+distribution = data_store.distribution_counts(dashboard_values)
+if not distribution.empty:
+    fig_distribution, fig_distribution_share = live_refresh.cached_figure(
+        "distribution", data_store.data_version(dashboard_values[data_store.DISTRIBUTION_RANGE]),
+        lambda: distribution_figures(distribution))
+    col_share, col_counts = st.columns(2)
+    with col_counts:
+        chart_payload.plotly_chart("PWA Distribution by Batch", fig_distribution, use_container_width=True)
+    with col_share:
+        chart_payload.plotly_chart("PWA Percentage Distribution by Batch", fig_distribution_share,
+                                   use_container_width=True)
+else:
+    st.info("No PWA distribution data available.")
 
 
 # Fetch data from DashBoard sheet (X15:Z27) for stacked bar and stacked line chart
-stacked_data = dashboard_worksheet.get_values("X15:Z27")
+stacked_data = dashboard_values["X15:Z27"]
 df_stacked = pd.DataFrame(stacked_data[1:], columns=stacked_data[0])  # First row as header
 
 # Convert columns to numeric, skipping rows with zero values
@@ -565,19 +699,18 @@ if not df_stacked.empty:
         # Apply rounded corners
         fig_stacked.update_traces(marker=dict(cornerradius=10))
 
-        # Add data labels on top of each stacked bar (Y + Z)
-        for i, row in df_stacked.iterrows():
-            total_value = row[df_stacked.columns[1]] + row[df_stacked.columns[2]]
-            fig_stacked.add_trace(go.Scatter(
-                x=[row[df_stacked.columns[0]]],
-                y=[total_value],
-                mode="markers+text",
-                marker=dict(size=30, color="#FF5733", opacity=0.6),  # Adjust color if needed
-                text=[total_value],
-                textfont=dict(size=14, color="white"),
-                textposition="middle center",
-                hoverinfo="none"
-            ))
+        # ✅ Add data labels on top of each stacked bar (Y + Z), one trace for all bars
+        total_values = df_stacked[df_stacked.columns[1]] + df_stacked[df_stacked.columns[2]]
+        fig_stacked.add_trace(go.Scatter(
+            x=df_stacked[df_stacked.columns[0]],
+            y=total_values,
+            mode="markers+text",
+            marker=dict(size=30, color="#FF5733", opacity=0.6),  # Adjust color if needed
+            text=total_values,
+            textfont=dict(size=14, color="white"),
+            textposition="middle center",
+            hoverinfo="none"
+        ))
 
         # Improve layout with bottom legend
         fig_stacked.update_layout(
@@ -589,7 +722,7 @@ if not df_stacked.empty:
             legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5)  # Move legend to bottom
         )
 
-        st.plotly_chart(fig_stacked, use_container_width=True)
+        chart_payload.plotly_chart("Monthly Production", fig_stacked, use_container_width=True)
 
 
 # Stacked Line Chart in Second Column
@@ -632,6 +765,20 @@ if not df_stacked.empty:
             legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5)  # Move legend to bottom
         )
 
-        st.plotly_chart(fig_line, use_container_width=True)
+        chart_payload.plotly_chart("Monthly Production (Line)", fig_line, use_container_width=True)
+
+
+# ---- CHART PAYLOAD REPORT (figure bytes per chart against the page budget) ----
+if st.session_state.get("payload_report"):
+    chart_payload.payload_report()
+
 
+# ---- LIVE MODE: poll the cached snapshot and rerun only when a section's data changed ----
+live_refresh.remember_rendered(live_refresh.section_versions(snapshot, dashboard_values))
+if live_interval:
+    live_refresh.start_polling(live_interval)
 
+# ---- PROFILER: close this rerun's profile and show results once all requested reruns are in ----
+profiler.stop()
+if profiler.is_admin(st.session_state.username):
+    profiler.profile_report()
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import data_store  # noqa: E402
+import fake_sheets  # noqa: E402
+
+# Fixed synthetic dataset every budget is measured against
+WORKBOOK_ROWS = 3000
+WORKBOOK_SEED = 0
+RENDER_TIMEOUT = 120
+
+TEST_SECRETS = {
+    "USER_CREDENTIALS": {"budget": "budget"},
+    "GOOGLE_SHEETS_CREDENTIALS": {"type": "service_account"},
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Recording fake gspread client, with fresh Streamlit caches and data directories"""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    monkeypatch.setenv("DASHBOARD_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    monkeypatch.setattr(data_store, "SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    monkeypatch.setattr(data_store, "HISTORY_DIR", str(tmp_path / "assembly_history"))
+    monkeypatch.setattr(data_store, "ENTRY_QUEUE_PATH", str(tmp_path / "entry_queue.sqlite"))
+    client = fake_sheets.FakeClient(fake_sheets.synthetic_workbook(rows=WORKBOOK_ROWS, seed=WORKBOOK_SEED))
+    with fake_sheets.patched(client):
+        yield client
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+class Render:
+    """One AppTest session of an app, measuring upstream calls and wall time per run"""
+
+    def __init__(self, script, client):
+        self.client = client
+        self.at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=RENDER_TIMEOUT)
+        self.at.secrets.update(TEST_SECRETS)
+        self.at.session_state["logged_in"] = True
+        self.at.session_state["username"] = "budget"
+
+    def run(self):
+        """Run the script once; returns (upstream calls, seconds)"""
+        calls_before = list(self.client.log.calls)
+        started = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - started
+        assert not self.at.exception, self.at.exception[0].message
+        return self.client.log.calls[len(calls_before):], elapsed
+
+
+@pytest.fixture
+def render(client):
+    return lambda script: Render(script, client)
+
+
+@pytest.fixture
+def snapshot(client, monkeypatch):
+    """Assembly snapshot of the synthetic workbook, loaded outside an app run"""
+    monkeypatch.setattr(st, "secrets", TEST_SECRETS)
+    return data_store.load_assembly_snapshot()
@@ -0,0 +1,50 @@
+import os
+import time
+
+import pandas as pd
+
+import arrow_snapshot
+import data_store
+
+FRAMES = {"sheet2": pd.DataFrame({"PWA No": ["PWA1", "PWA2"], "Count": [1, 2]})}
+
+
+def test_snapshot_text_columns_stay_on_arrow_buffers(snapshot):
+    assert isinstance(snapshot.hot["Device Type"].dtype, pd.ArrowDtype)
+    assert isinstance(snapshot.sheet1["PWA No"].dtype, pd.ArrowDtype)
+
+
+def test_publish_swaps_the_manifest_in_last(tmp_path):
+    root = str(tmp_path)
+    assert arrow_snapshot.read_manifest(root) is None
+    manifest = arrow_snapshot.publish(root, FRAMES, {"fetched_at": 1.0}, "v1")
+    assert arrow_snapshot.read_manifest(root) == manifest
+    assert manifest["files"] == {"sheet2": "sheet2-v1.arrow"}
+    assert not [name for name in os.listdir(root) if name.endswith(".tmp")]
+    tables = arrow_snapshot.open_tables(root, manifest)
+    assert tables["sheet2"].column("PWA No").to_pylist() == ["PWA1", "PWA2"]
+
+
+def test_old_versions_are_pruned(tmp_path):
+    root = str(tmp_path)
+    for version in ("v1", "v2", "v3"):
+        arrow_snapshot.publish(root, FRAMES, {}, version)
+        time.sleep(0.01)  # Versions are ordered by file time
+    assert sorted(name for name in os.listdir(root) if name.endswith(".arrow")) == [
+        "sheet2-v2.arrow", "sheet2-v3.arrow"]
+
+
+def test_fresh_snapshot_is_mapped_without_fetching(tmp_path):
+    root = str(tmp_path)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return FRAMES, {}, f"v{len(fetches)}"
+
+    _, first = arrow_snapshot.shared_snapshot(root, fetch, max_age=60)
+    _, second = arrow_snapshot.shared_snapshot(root, fetch, max_age=60)
+    assert second["version"] == first["version"] == "v1"
+    _, stale = arrow_snapshot.shared_snapshot(root, fetch, max_age=0)
+    assert stale["version"] == "v2"
+    assert len(fetches) == 2
@@ -0,0 +1,26 @@
+import datetime
+import io
+
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+import assembly_export
+import data_store
+
+
+@pytest.mark.parametrize("fmt", sorted(assembly_export.FORMATS))
+def test_export_is_accepted_by_the_download_button(snapshot, fmt):
+    # Spans Parquet history and hot rows
+    start = snapshot.hot_start - datetime.timedelta(days=60)
+    end = snapshot.hot_start + datetime.timedelta(days=30)
+    chunks = data_store.iter_assembly_rows(snapshot, start, end, chunk_rows=100)
+    data, _ = convert_data_to_bytes_and_infer_mime(
+        assembly_export.export_file(chunks, fmt), RuntimeError("unsupported type"))
+
+    expected = len(data_store.select_assembly_rows(snapshot, start, end))
+    if fmt == "Parquet":
+        exported = pd.read_parquet(io.BytesIO(data))
+    else:
+        exported = pd.read_csv(io.BytesIO(data))
+    assert len(exported) == expected > 100
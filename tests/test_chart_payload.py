@@ -0,0 +1,40 @@
+import plotly.graph_objects as go
+
+import chart_payload
+
+LABEL = dict(mode="markers+text", marker=dict(size=30, color="#66cdfb"), textposition="middle center")
+
+
+def test_label_traces_with_the_same_style_merge():
+    traces = [go.Scatter(x=[day], y=[count], text=[count], **LABEL).to_plotly_json()
+              for day, count in (("05-01", 3), ("05-02", 5))]
+    merged = chart_payload.merge_styled_traces(traces)
+    assert len(merged) == 1
+    assert list(merged[0]["x"]) == ["05-01", "05-02"]
+    assert list(merged[0]["text"]) == ["3", "5"]
+
+
+def test_lines_scalar_text_and_other_styles_are_kept_apart():
+    lines = [go.Scatter(x=[1, 2], y=[1, 2], mode="lines").to_plotly_json() for _ in range(2)]
+    default_mode = [go.Scatter(x=[1], y=[1]).to_plotly_json() for _ in range(2)]
+    scalar_text = [go.Scatter(x=[1], y=[1], text="label", **LABEL).to_plotly_json() for _ in range(2)]
+    other_color = [go.Scatter(x=[1], y=[1], mode="markers", marker=dict(color=color)).to_plotly_json()
+                   for color in ("red", "blue")]
+    for traces in (lines, default_mode, scalar_text, other_color):
+        assert chart_payload.merge_styled_traces(traces) == traces
+
+
+def test_compact_figure_merges_labels_and_keeps_bars():
+    fig = go.Figure(go.Bar(x=["a", "b"], y=[1, 2]))
+    for x, y in (("a", 1), ("b", 2)):
+        fig.add_trace(go.Scatter(x=[x], y=[y], text=[y], **LABEL))
+    compacted = chart_payload.compact_figure(fig)
+    assert [trace.type for trace in compacted.data] == ["bar", "scatter"]
+    assert compacted.layout == fig.layout
+
+
+def test_webgl_above_the_point_threshold():
+    fig = go.Figure([go.Bar(x=[1], y=[1]), go.Scatter(x=list(range(20)), y=list(range(20)), mode="lines")])
+    # 21 points in the figure, the bar's included
+    assert [t.type for t in chart_payload.compact_figure(fig, webgl_threshold=21).data] == ["bar", "scatter"]
+    assert [t.type for t in chart_payload.compact_figure(fig, webgl_threshold=20).data] == ["bar", "scattergl"]
@@ -0,0 +1,37 @@
+import pytest
+import streamlit as st
+
+import data_store
+
+
+@pytest.mark.parametrize("share", [True, False])
+def test_sheet1_with_blank_and_repeated_headers_loads(client, monkeypatch, share):
+    monkeypatch.setattr(st, "secrets", {"GOOGLE_SHEETS_CREDENTIALS": {}})
+    monkeypatch.setattr(data_store, "SHARE_SNAPSHOT", share)
+    sheet1 = client.workbook["Sheet1"]
+    client.workbook["Sheet1"] = [[*row, "", "", row[-1]] for row in sheet1]
+
+    snapshot = data_store.load_assembly_snapshot()
+    assert list(snapshot.sheet1.columns) == [*sheet1[0], f"{sheet1[0][-1]} (2)"]
+    assert len(snapshot.sheet1) == len(sheet1) - 1
+    assert not snapshot.trace.lookup(sheet1[1][0]).empty
+
+
+def test_distribution_counts_take_batches_from_the_range_width():
+    values = {data_store.DISTRIBUTION_RANGE: [
+        ["Device Type", "Count", "Batch 4", ""],
+        ["Alpha", "10", "20", "30"],
+        ["Beta", "5", "", "x"],
+        ["", "1", "1", "1"],  # Rows without a device type are skipped
+    ]}
+    table = data_store.distribution_counts(values)
+    assert table.to_dict("list") == {
+        "Batch": ["Batch 3", "Batch 4", "Batch 5", "Batch 3", "Batch 4", "Batch 5"],
+        "Device Type": ["Alpha"] * 3 + ["Beta"] * 3,
+        "Count": [10, 20, 30, 5, 0, 0],
+    }
+
+
+def test_distribution_counts_of_an_empty_block():
+    assert data_store.distribution_counts({}).empty
+    assert data_store.distribution_counts({data_store.DISTRIBUTION_RANGE: [["Device Type", "Count"]]}).empty
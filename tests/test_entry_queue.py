@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+import data_store
+import entry_queue
+
+RECORD = {"Date of Assambly": "2024-05-02", "Device Type": "Alpha", "PWA No": "PWA1", "Batch": "Batch 3"}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "queue.sqlite")
+
+
+def test_flush_sends_pending_entries_in_one_batch(path):
+    entry_queue.enqueue(path, [RECORD, {**RECORD, "PWA No": "PWA2"}])
+    batches = []
+    assert entry_queue.flush(path, batches.append) == 2
+    assert [[r["PWA No"] for r in batch] for batch in batches] == [["PWA1", "PWA2"]]
+    assert entry_queue.flush(path, batches.append) == 0
+    assert entry_queue.status(path)["pending"] == 0
+
+
+def test_failed_flush_is_retried_after_backoff(path, monkeypatch):
+    entry_queue.enqueue(path, [RECORD])
+
+    def fail(records):
+        raise ConnectionError("sheet unavailable")
+
+    assert entry_queue.flush(path, fail) == 0
+    status = entry_queue.status(path)
+    assert status["pending"] == 1 and status["last_error"] == "sheet unavailable"
+
+    sent = []
+    assert entry_queue.flush(path, sent.append) == 0  # Still backing off
+    later = time.time() + entry_queue.RETRY_BASE_SECONDS + 1
+    monkeypatch.setattr(entry_queue.time, "time", lambda: later)
+    assert entry_queue.flush(path, sent.append) == 1
+    assert entry_queue.status(path)["last_error"] is None
+
+
+def test_claimed_entries_are_not_sent_twice(path):
+    entry_queue.enqueue(path, [RECORD])
+    nested = []
+
+    def append(records):
+        nested.append(entry_queue.flush(path, lambda r: None))  # Another replica flushing meanwhile
+
+    assert entry_queue.flush(path, append) == 1
+    assert nested == [0]
+
+
+def test_unsynced_keeps_entries_sent_after_the_snapshot_read(path):
+    read_started = time.time()
+    entry_queue.enqueue(path, [RECORD])
+    assert [record["PWA No"] for _, record in entry_queue.unsynced(path, read_started)] == ["PWA1"]
+    entry_queue.flush(path, lambda records: None)
+    assert len(entry_queue.unsynced(path, read_started)) == 1
+    assert entry_queue.unsynced(path, time.time() + 1) == []
+
+
+def test_queued_entries_show_in_the_current_snapshot(snapshot):
+    record = {**RECORD, "Date of Assambly": str(snapshot.hot_start), "PWA No": "PWA999999"}
+    data_store.queue_entries([record])
+    current = data_store.current_snapshot()
+    assert current.version != snapshot.version
+    assert current is data_store.current_snapshot()  # Live polling compares this version
+    assert current.pwa_bounds[1] == 999999
+    assert current.trace.lookup("pwa999999")["Source"].tolist() == [data_store.ENTRY_SOURCE]
+    assert len(current.hot) == len(snapshot.hot) + 1
+    assert snapshot.trace.lookup("PWA999999").empty
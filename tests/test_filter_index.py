@@ -0,0 +1,44 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import filter_index
+
+DF = pd.DataFrame({
+    "Date of Assambly": pd.to_datetime(["2024-05-01 08:00", "2024-05-02 23:59", "2024-05-03 00:00",
+                                        "2024-05-02 12:00", None]),
+    "Device Type": ["Alpha", "Beta", "Alpha", "Alpha", "Beta"],
+    "Batch": [3, "3", "Batch 4", 3, 4],
+    "PWA No": ["PWA-00010", "PWA-00020", "x", "PWA-00030", "PWA-00040"],
+})
+
+
+def test_pwa_numbers_take_the_digits():
+    assert np.array_equal(filter_index.pwa_numbers(["PWA-01234", "PWA7", "none"]), [1234, 7, np.nan],
+                          equal_nan=True)
+
+
+def test_select_combines_every_filter():
+    index = filter_index.AssemblyIndex(DF)
+    assert index.select().tolist() == [0, 1, 2, 3, 4]
+    assert index.select({"Device Type": ["Alpha"], "Batch": None}).tolist() == [0, 2, 3]
+    # Sheet numbers and text agree on the batch key
+    assert index.select({"Batch": ["3"]}).tolist() == [0, 1, 3]
+    assert index.select({"Device Type": ["Alpha"]}, pwa_range=(20, 40)).tolist() == [3]
+    assert index.select({"Device Type": ["Gamma"]}).tolist() == []
+
+
+def test_plain_end_date_covers_its_whole_day():
+    index = filter_index.AssemblyIndex(DF)
+    day = datetime.date(2024, 5, 2)
+    assert index.select(date_range=(day, day)).tolist() == [1, 3]
+    # A timestamp end is taken as given
+    assert index.select(date_range=(day, datetime.datetime(2024, 5, 2, 12))).tolist() == [3]
+
+
+def test_bounds_and_values():
+    index = filter_index.AssemblyIndex(DF)
+    assert index.bounds("PWA No") == (10, 40)
+    assert index.values("Device Type") == ["Alpha", "Beta"]
+    assert filter_index.AssemblyIndex(DF.iloc[:0]).bounds("PWA No") is None
@@ -0,0 +1,55 @@
+import datetime
+import math
+
+import pandas as pd
+
+import forecast
+
+TODAY = datetime.date(2024, 5, 31)
+
+
+def daily(boards_per_day, batch="Batch 3", days=forecast.FIT_DAYS):
+    dates = pd.date_range(end=pd.Timestamp(TODAY), periods=days, freq="D")
+    index = pd.MultiIndex.from_arrays([[batch] * days, ["Alpha"] * days, dates], names=["Batch", "Device Type", "day"])
+    boards = [boards_per_day[i % len(boards_per_day)] for i in range(days)]
+    return pd.DataFrame({"boards": boards, "failed": 0}, index=index)
+
+
+def test_remaining_inventory_subtracts_used_and_failed():
+    labels = ["Used", "Failed", "Spare", "Total PWA"]
+    values = {
+        "W1:Z1": [labels],
+        "W1:Z2": [labels, ["40", "5", "0", "100"]],  # Batch 3 rows start with the labels
+        "W3:Z3": [["10", "0", "0", "10"]],
+    }
+    assert forecast.remaining_inventory(values) == {"Batch 3": 55, "Batch 2": 0}
+
+
+def test_rate_band_is_the_standard_error_of_the_daily_mean():
+    rates = forecast.consumption_rates(daily([1, 3]), today=TODAY)
+    rate = rates.loc["3"]
+    error = forecast.Z_SCORE * pd.Series([1, 3] * 30).std(ddof=1) / math.sqrt(forecast.FIT_DAYS)
+    assert rate["rate"] == 2
+    assert math.isclose(rate["rate_high"] - rate["rate"], error)
+    assert math.isclose(rate["rate"] - rate["rate_low"], error)
+
+
+def test_days_without_assemblies_lower_the_rate():
+    rates = forecast.consumption_rates(daily([4], days=15), today=TODAY)
+    assert rates.loc["3", "rate"] == 1
+
+
+def test_run_out_dates_follow_the_band():
+    rates = pd.DataFrame({"rate": [2.0], "rate_low": [1.0], "rate_high": [4.0]}, index=["3"])
+    row = forecast.forecast_depletion({"Batch 3": 9}, rates, today=TODAY).iloc[0]
+    today = pd.Timestamp(TODAY)
+    assert row["Run-out date"] == today + pd.Timedelta(days=5)  # 4.5 days rounds up
+    assert row["Earliest"] == today + pd.Timedelta(days=3)
+    assert row["Latest"] == today + pd.Timedelta(days=9)
+
+
+def test_idle_or_empty_batches():
+    rates = pd.DataFrame({"rate": [0.0], "rate_low": [0.0], "rate_high": [0.0]}, index=["3"])
+    rows = forecast.forecast_depletion({"Batch 3": 9, "Batch 4": 0, "Batch 2": 5}, rates, today=TODAY)
+    assert rows["Run-out date"].isna().tolist() == [True, False, True]
+    assert rows["Run-out date"].iloc[1] == pd.Timestamp(TODAY)
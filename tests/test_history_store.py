@@ -0,0 +1,66 @@
+import datetime
+import os
+
+import pandas as pd
+
+import history_store
+
+
+def frame(dates):
+    return pd.DataFrame({
+        "Date of Assambly": pd.to_datetime(dates, format="mixed"),
+        "Device Type": ["Alpha"] * len(dates),
+        "PWA No": [f"PWA{i}" for i in range(len(dates))],
+    })
+
+
+def partitions(root):
+    return sorted(entry for entry in os.listdir(root) if entry.startswith("month="))
+
+
+def test_months_between_crosses_years():
+    assert history_store.months_between(datetime.date(2023, 11, 30), datetime.date(2024, 2, 1)) == [
+        "2023-11", "2023-12", "2024-01", "2024-02"]
+
+
+def test_sync_rewrites_only_changed_months(tmp_path):
+    root = str(tmp_path)
+    df = frame(["2024-03-05", "2024-03-20", "2024-04-02", "2024-05-09"])
+    assert history_store.sync_partitions(df, root) == ["2024-03", "2024-04", "2024-05"]
+    assert history_store.sync_partitions(df, root) == []
+
+    edited = df.copy()
+    edited.loc[2, "Device Type"] = "Beta"
+    assert history_store.sync_partitions(edited, root) == ["2024-04"]
+    assert not [f for f in os.listdir(os.path.join(root, "month=2024-04")) if f.endswith(".tmp")]
+
+
+def test_sync_removes_months_no_longer_present(tmp_path):
+    root = str(tmp_path)
+    history_store.sync_partitions(frame(["2024-03-05", "2024-04-02"]), root)
+    history_store.sync_partitions(frame(["2024-04-02"]), root)
+    assert partitions(root) == ["month=2024-04"]
+
+
+def test_read_range_opens_only_overlapping_partitions_and_includes_the_end_day(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    history_store.sync_partitions(frame(["2024-03-05", "2024-04-02 18:30", "2024-04-03", "2024-05-09"]), root)
+    opened = []
+    dataset = history_store.ds.dataset
+
+    def recording_dataset(paths, **kwargs):
+        opened.extend(paths)
+        return dataset(paths, **kwargs)
+
+    monkeypatch.setattr(history_store.ds, "dataset", recording_dataset)
+
+    rows = history_store.read_range(root, datetime.date(2024, 3, 10), datetime.date(2024, 4, 2),
+                                    columns=["Date of Assambly", "PWA No"])
+    assert rows["PWA No"].tolist() == ["PWA1"]
+    assert list(rows.columns) == ["Date of Assambly", "PWA No"]
+    assert [os.path.basename(os.path.dirname(path)) for path in opened] == ["month=2024-03", "month=2024-04"]
+
+
+def test_read_range_without_partitions_is_empty(tmp_path):
+    rows = history_store.read_range(str(tmp_path), datetime.date(2024, 1, 1), datetime.date(2024, 1, 31))
+    assert rows.empty
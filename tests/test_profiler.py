@@ -0,0 +1,22 @@
+import sys
+
+import streamlit as st
+
+import profiler
+
+
+class SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+def test_run_that_ended_early_is_disabled_and_dropped(monkeypatch):
+    monkeypatch.setattr(st, "session_state", SessionState(profile_remaining=2))
+    profiler.start()
+    assert sys.getprofile() is not None
+
+    # The run stopped before profiler.stop(); the next run starts without profiling reruns left
+    st.session_state.profile_remaining = 0
+    profiler.start()
+    assert sys.getprofile() is None
+    assert "profile_active" not in st.session_state
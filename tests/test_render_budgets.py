@@ -0,0 +1,96 @@
+"""Per-render budgets for both dashboards against the recording fake client.
+
+A change that adds an upstream call, a per-row trace loop or a slow step on
+the render path fails here with the offending calls or figures listed. When
+a change legitimately moves a budget, update the number in BUDGETS in the
+same change. Render times are scaled by BUDGET_TIME_SCALE (default 1) for
+slow machines.
+
+Run with ``python -m pytest tests``.
+"""
+import json
+import os
+
+import pytest
+
+TIME_SCALE = float(os.environ.get("BUDGET_TIME_SCALE", "1"))
+
+BUDGETS = {
+    "streamlit_app.py": {
+        "first_render_calls": 14,  # open_by_url, 3 worksheets, Sheet2, Sheet1 and 8 DashBoard ranges
+        "rerun_calls": 0,  # Everything else is served from the shared caches
+        "max_traces": 8,
+        "first_render_seconds": 10.0,
+        "rerun_seconds": 3.0,
+    },
+    # Legacy entry point: values are read on every run, and per-row marker traces in the trend and monthly charts
+    "Dashboard.py": {
+        "first_render_calls": 9,  # open_by_url, worksheet metadata, Sheet2, Sheet1 and 5 DashBoard ranges
+        "rerun_calls": 7,  # Spreadsheet and worksheet handles are cached
+        "max_traces": 40,
+        "first_render_seconds": 10.0,
+        "rerun_seconds": 5.0,
+    },
+}
+
+
+def figure_traces(at):
+    """(title, trace count) of every Plotly chart on the page"""
+    figures = []
+    for element in at.get("plotly_chart"):
+        spec = json.loads(element.proto.spec)
+        title = spec.get("layout", {}).get("title", "")
+        title = title.get("text", "") if isinstance(title, dict) else title
+        figures.append((title or "untitled", len(spec.get("data", []))))
+    return figures
+
+
+def describe(calls):
+    return "\n".join("  " + " ".join(map(str, call)) for call in calls)
+
+
+@pytest.mark.parametrize("script", sorted(BUDGETS))
+def test_upstream_calls_per_render(render, script):
+    budget = BUDGETS[script]
+    session = render(script)
+
+    calls, _ = session.run()
+    assert len(calls) <= budget["first_render_calls"], (
+        f"{script} made {len(calls)} upstream calls on first render "
+        f"(budget {budget['first_render_calls']}):\n{describe(calls)}")
+
+    calls, _ = session.run()
+    assert len(calls) <= budget["rerun_calls"], (
+        f"{script} made {len(calls)} upstream calls on rerun (budget {budget['rerun_calls']}):\n{describe(calls)}")
+
+
+def test_new_session_reuses_shared_caches(render):
+    render("streamlit_app.py").run()
+    calls, _ = render("streamlit_app.py").run()
+    assert not calls, f"A second session made {len(calls)} upstream calls:\n{describe(calls)}"
+
+
+@pytest.mark.parametrize("script", sorted(BUDGETS))
+def test_traces_per_figure(render, script):
+    session = render(script)
+    # Compaction merges one-point label traces, which would hide a new per-row trace loop
+    session.at.session_state["compact_charts"] = False
+    session.run()
+    figures = figure_traces(session.at)
+    assert figures, f"{script} drew no Plotly charts"
+    over = [(title, traces) for title, traces in figures if traces > BUDGETS[script]["max_traces"]]
+    assert not over, f"{script} figures over {BUDGETS[script]['max_traces']} traces: {over}"
+
+
+@pytest.mark.parametrize("script", sorted(BUDGETS))
+def test_render_time(render, script):
+    budget = BUDGETS[script]
+    session = render(script)
+
+    _, elapsed = session.run()
+    limit = budget["first_render_seconds"] * TIME_SCALE
+    assert elapsed <= limit, f"{script} first render took {elapsed:.2f} s (budget {limit:.2f} s)"
+
+    _, elapsed = session.run()
+    limit = budget["rerun_seconds"] * TIME_SCALE
+    assert elapsed <= limit, f"{script} rerun took {elapsed:.2f} s (budget {limit:.2f} s)"
@@ -0,0 +1,27 @@
+import pandas as pd
+
+import rolling_analytics
+
+
+def frame(statuses):
+    return pd.DataFrame({
+        "Date of Assambly": pd.to_datetime(["2024-05-01", "2024-05-01", "2024-05-02", "2024-05-03"][:len(statuses)]),
+        "Device Type": "Alpha",
+        "Batch": "Batch 3",
+        "Status": statuses,
+    })
+
+
+def test_appended_rows_extend_the_series():
+    series = rolling_analytics.DailySeries()
+    series.update(frame(["Used", "Used", "Failed"]))
+    counts = series.update(frame(["Used", "Used", "Failed", "Failed"]))
+    assert counts.equals(rolling_analytics.daily_counts(frame(["Used", "Used", "Failed", "Failed"])))
+
+
+def test_edited_older_row_rebuilds_the_series():
+    series = rolling_analytics.DailySeries()
+    series.update(frame(["Used", "Used", "Used"]))
+    counts = series.update(frame(["Failed", "Used", "Used", "Used"]))
+    assert counts["failed"].sum() == 1
+    assert counts["boards"].sum() == 4
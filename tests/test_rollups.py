@@ -0,0 +1,70 @@
+import datetime
+
+import pandas as pd
+
+import rollups
+
+DAY = datetime.date(2024, 5, 2)
+
+
+def frame(timestamps, devices=None):
+    return pd.DataFrame({
+        "Date of Assambly": pd.to_datetime(timestamps),
+        "Device Type": devices or ["Alpha"] * len(timestamps),
+        "Batch": ["Batch 3"] * len(timestamps),
+    })
+
+
+def test_night_shift_belongs_to_the_day_it_started():
+    df = frame(["2024-05-02 07:10", "2024-05-02 15:00", "2024-05-02 23:30", "2024-05-03 02:00"])
+    shifts = rollups.RollupPyramid(df).counts("Shift", DAY, DAY + datetime.timedelta(days=1))
+    assert [rollups.period_label(start, "Shift") for start in shifts.index] == [
+        "2024-05-02 Shift 1", "2024-05-02 Shift 2", "2024-05-02 Shift 3"]
+    assert shifts.tolist() == [1, 1, 2]
+
+
+def test_levels_roll_up_to_the_same_total():
+    df = frame([f"2024-05-{day:02d} {hour:02d}:15" for day in range(1, 29) for hour in (3, 9, 17)])
+    pyramid = rollups.RollupPyramid(df)
+    assert pyramid.granularities == list(rollups.GRANULARITIES)
+    for granularity in pyramid.granularities:
+        counts = pyramid.counts(granularity, datetime.date(2024, 4, 1), datetime.date(2024, 6, 30))
+        assert counts.sum() == len(df), granularity
+
+
+def test_plain_dates_start_at_day_level():
+    df = frame(["2024-05-02", "2024-05-02", "2024-05-09"])
+    pyramid = rollups.RollupPyramid(df)
+    assert pyramid.granularities == ["Day", "Week", "Month"]
+    assert pyramid.counts("Day", DAY, DAY).tolist() == [2]
+
+
+def test_counts_filter_by_group():
+    df = frame(["2024-05-02 10:00"] * 3, devices=["Alpha", "Beta", "Beta"])
+    counts = rollups.RollupPyramid(df).counts("Day", DAY, DAY, {"Device Type": ["Beta"], "Batch": None})
+    assert counts.tolist() == [2]
+
+
+def test_rollup_of_rows_matches_pyramid():
+    df = frame(["2024-05-02 23:30", "2024-05-03 02:00", "2024-05-03 08:00"])
+    pyramid = rollups.RollupPyramid(df)
+    assert rollups.rollup(df, "Day", pyramid.base).tolist() == pyramid.counts("Day", DAY, DAY + datetime.timedelta(days=1)).tolist()
+
+
+def test_periods_running_past_the_dates_only_count_rows_on_them():
+    df = frame(["2024-04-29 10:00", "2024-04-30 10:00", "2024-05-01 10:00", "2024-05-02 10:00",
+                "2024-05-15 10:00", "2024-05-05 23:00"])
+    pyramid = rollups.RollupPyramid(df)
+    start, end = datetime.date(2024, 5, 1), datetime.date(2024, 5, 3)
+    for granularity in pyramid.granularities:
+        counts = pyramid.counts(granularity, start, end)
+        assert counts.sum() == 2, granularity
+        in_range = df[(df["Date of Assambly"] >= "2024-05-01") & (df["Date of Assambly"] < "2024-05-04")]
+        assert counts.tolist() == rollups.rollup(in_range, granularity, pyramid.base).tolist(), granularity
+
+
+def test_shift_counts_skip_the_night_before_the_range():
+    # 2024-05-06 is a Monday; the Sunday night shift started before the range
+    df = frame(["2024-05-05 23:00", "2024-05-06 02:00", "2024-05-06 09:00"])
+    shifts = rollups.RollupPyramid(df).counts("Shift", datetime.date(2024, 5, 6), datetime.date(2024, 5, 12))
+    assert shifts.sum() == 2
@@ -0,0 +1,43 @@
+import gspread
+import pytest
+
+import fake_sheets
+import sheet_handles
+
+
+@pytest.fixture
+def fake():
+    return fake_sheets.FakeClient(fake_sheets.synthetic_workbook(rows=50))
+
+
+def test_metadata_is_loaded_once(fake):
+    sheets = sheet_handles.SheetHandles(fake.open_by_url("url"))
+    sheets.get_all_records("Sheet2")
+    sheets.get_values("Sheet1", "A:I")
+    sheets.get_values("DashBoard", "X8:Y8")
+    sheets.get_values("DashBoard", "W1:Z2")
+    assert fake.log.count("worksheets") == 1
+    assert fake.log.count("worksheet") == 0
+
+
+def test_renamed_sheet_refreshes_handles(fake):
+    sheets = sheet_handles.SheetHandles(fake.open_by_url("url"))
+    dashboard = fake.workbook.pop("DashBoard")
+    fake.workbook["Dashboard v2"] = dashboard
+
+    # The cached handle now points at a sheet the API no longer knows
+    with pytest.raises(gspread.exceptions.WorksheetNotFound):
+        sheets.get_values("DashBoard", "X8:Y8")
+    assert fake.log.count("worksheets") == 2
+    assert sheets.get_values("Dashboard v2", "X8:Y8") == dashboard["X8:Y8"]
+    assert fake.log.count("worksheets") == 2
+
+
+def test_unknown_title_reloads_metadata_once(fake):
+    sheets = sheet_handles.SheetHandles(fake.open_by_url("url"))
+    fake.workbook["Sheet3"] = [["a"], ["1"]]
+    assert sheets.get_values("Sheet3") == [["a"], ["1"]]
+    assert fake.log.count("worksheets") == 2
+    with pytest.raises(gspread.exceptions.WorksheetNotFound):
+        sheets.worksheet("Missing")
+    assert fake.log.count("worksheets") == 3
@@ -0,0 +1,31 @@
+import pandas as pd
+
+import traceability
+
+SHEET2 = pd.DataFrame({"PWA No": ["PWA100", "pwa101 ", "PWA200", ""], "Device Type": ["Alpha", "Beta", "Alpha", "Beta"]})
+SHEET1 = pd.DataFrame({"PWA No": ["PWA101", "PWA300"], "Status": ["OK", "Rework"]})
+
+
+def test_lookup_normalizes_and_spans_both_sheets():
+    index = traceability.PwaIndex({"Sheet2": SHEET2, "Sheet1": SHEET1, "Other": None})
+    rows = index.lookup(" pwa101")
+    assert rows["Source"].tolist() == ["Sheet2", "Sheet1"]
+    assert rows["Device Type"].iloc[0] == "Beta"
+    assert index.lookup("PWA999").empty
+    assert len(index) == 4  # The blank PWA number is not indexed
+
+
+def test_prefix_returns_sorted_matches_up_to_limit():
+    index = traceability.PwaIndex({"Sheet2": SHEET2, "Sheet1": SHEET1})
+    assert index.prefix("pwa1") == ["PWA100", "PWA101"]
+    assert index.prefix("PWA", limit=3) == ["PWA100", "PWA101", "PWA200"]
+    assert index.prefix("PWA4") == []
+
+
+def test_extended_leaves_the_original_index_unchanged():
+    index = traceability.PwaIndex({"Sheet2": SHEET2})
+    extended = index.extended("App entry", pd.DataFrame({"PWA No": ["PWA100", "PWA400"]}))
+    assert extended.lookup("PWA100")["Source"].tolist() == ["Sheet2", "App entry"]
+    assert extended.prefix("PWA4") == ["PWA400"]
+    assert index.lookup("PWA100")["Source"].tolist() == ["Sheet2"]
+    assert index.prefix("PWA4") == []
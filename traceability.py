@@ -0,0 +1,63 @@
+"""Hash index from PWA number to the sheet rows that mention it.
+
+Built once per data snapshot over Sheet1 and Sheet2. Exact lookups are a
+single dict access; prefix search bisects a sorted key list, so both stay
+instant regardless of how many boards have been recorded.
+"""
+import bisect
+import copy
+
+import pandas as pd
+
+PWA_COLUMN = "PWA No"
+
+
+def normalize_pwa(value):
+    """Canonical lookup key for a PWA number as typed or stored"""
+    return str(value).strip().upper()
+
+
+class PwaIndex:
+    """PWA number -> (source, row position) over one or more sheet frames"""
+
+    def __init__(self, frames):
+        self.frames = {}
+        self._positions = {}
+        for source, frame in frames.items():
+            if frame is None or PWA_COLUMN not in frame.columns:
+                continue
+            frame = frame.reset_index(drop=True)
+            self.frames[source] = frame
+            for position, key in enumerate(frame[PWA_COLUMN].map(normalize_pwa)):
+                if key:
+                    self._positions.setdefault(key, []).append((source, position))
+        self._keys = sorted(self._positions)
+
+    def extended(self, source, frame):
+        """New index that also covers the rows of frame under source; this one is unchanged"""
+        added = PwaIndex({source: frame})
+        result = copy.copy(self)
+        result.frames = {**self.frames, **added.frames}
+        result._positions = dict(self._positions)
+        for key, positions in added._positions.items():
+            result._positions[key] = [*self._positions.get(key, []), *positions]
+        result._keys = sorted(result._positions)
+        return result
+
+    def __len__(self):
+        return len(self._keys)
+
+    def lookup(self, pwa):
+        """All rows recorded for one PWA number, tagged with the sheet they came from"""
+        rows = []
+        for source, position in self._positions.get(normalize_pwa(pwa), []):
+            row = self.frames[source].iloc[position].to_dict()
+            rows.append({"Source": source, **row})
+        return pd.DataFrame(rows)
+
+    def prefix(self, prefix, limit=50):
+        """Up to limit PWA numbers starting with prefix, in sorted order"""
+        prefix = normalize_pwa(prefix)
+        start = bisect.bisect_left(self._keys, prefix)
+        stop = bisect.bisect_left(self._keys, prefix + "\uffff", lo=start)
+        return self._keys[start:min(stop, start + limit)]